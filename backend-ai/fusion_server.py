@@ -4,45 +4,193 @@
 
 import asyncio
 import aiohttp
+import fcntl
 import json
+import orjson
+import os
 import subprocess
 import time
-from typing import Dict, Any, Optional
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Tuple
 import logging
 from pathlib import Path
 import psutil
-import numpy as np
+from yarl import URL
 from datetime import datetime
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Request bodies to the C++ engine are pre-encoded with orjson
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Lock/state file ensuring a single C++ engine across uvicorn workers. The lock holder keeps
+# {"owner": worker pid, "pid": engine pid, "status": starting|ok|failed, "reason": ...} in it
+CPP_LOCK_PATH = os.getenv("CPP_LOCK_PATH", "/tmp/aimc.lock")
+
+# Liveness of the C++ engine is probed with a bare TCP connect (seconds)
+CPP_PROBE_TIMEOUT = 0.1
+
+# Micro-batching for C++ inference: max tasks per batch and collection window (s)
+CPP_BATCH_MAX = int(os.getenv("CPP_BATCH_MAX", "32"))
+CPP_BATCH_WINDOW = float(os.getenv("CPP_BATCH_WINDOW", "0.003"))
+# /classify_batch RPCs in flight at once; a slow batch no longer holds up the next one
+CPP_BATCH_CONCURRENCY = int(os.getenv("CPP_BATCH_CONCURRENCY", "8"))
+# Per-batch deadline (s): the single-task budget plus a share per task in the batch
+CPP_TIMEOUT = 0.1
+CPP_TIMEOUT_PER_TASK = float(os.getenv("CPP_TIMEOUT_PER_TASK", "0.002"))
+
+# Coalescing of Python fallback requests into one model.predict call
+PYTHON_BATCH_MAX = int(os.getenv("PYTHON_BATCH_MAX", "64"))
+PYTHON_BATCH_WINDOW = float(os.getenv("PYTHON_BATCH_WINDOW", "0.002"))
+# Threads running Python engine batches off the event loop
+PYTHON_ENGINE_THREADS = int(os.getenv("PYTHON_ENGINE_THREADS", str(os.cpu_count() or 1)))
+
+# Tasks longer than this (characters) always go to the Python engine
+CPP_MAX_TASK_LENGTH = 1000
+
+# Memory usage reported by /metrics is sampled in the background (seconds)
+RSS_SAMPLE_INTERVAL = 1.0
+
+# Maximum number of cached classification results (LRU)
+RESULT_CACHE_MAX = int(os.getenv("RESULT_CACHE_MAX", "4096"))
+
+# Response timestamp, refreshed by _tick() instead of formatted per request
+CLOCK_TICK_INTERVAL = 0.01
+_NOW_ISO = datetime.now().isoformat(timespec="milliseconds")
+
+
+async def _tick():
+    """Keep _NOW_ISO current to within CLOCK_TICK_INTERVAL"""
+    global _NOW_ISO
+    while True:
+        _NOW_ISO = datetime.now().isoformat(timespec="milliseconds")
+        await asyncio.sleep(CLOCK_TICK_INTERVAL)
+
+
+def _write_lock_state(lock_fd: int, **state):
+    """Replace the lock file contents with this worker's engine start state"""
+    os.ftruncate(lock_fd, 0)
+    os.pwrite(lock_fd, orjson.dumps({"owner": os.getpid(), **state}), 0)
+
+
+def _read_lock_state(raw: Optional[bytes] = None) -> Dict[str, Any]:
+    """Engine start state from the lock file; {} if unreadable (older files hold a bare engine pid)"""
+    try:
+        if raw is None:
+            raw = Path(CPP_LOCK_PATH).read_bytes()
+        raw = raw.strip()
+        if raw.isdigit():
+            return {"pid": int(raw)}
+        state = orjson.loads(raw)
+        return state if isinstance(state, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+async def _collect_batch(queue: asyncio.Queue, max_size: int, window: float) -> list:
+    """Wait for one queued item, then gather more until max_size or window elapses"""
+    items = [await queue.get()]
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + window
+
+    while len(items) < max_size:
+        if not queue.empty():
+            items.append(queue.get_nowait())
+            continue
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        try:
+            items.append(await asyncio.wait_for(queue.get(), timeout=remaining))
+        except asyncio.TimeoutError:
+            break
+
+    return items
+
+
+class LatencyStats:
+    """Running mean (Welford) over all samples plus a bounded window of recent ones"""
+
+    def __init__(self, window: int = 1024):
+        self.recent = deque(maxlen=window)
+        self.count = 0
+        self.mean = 0.0
+
+    def record(self, latency_ms: float):
+        self.count += 1
+        self.mean += (latency_ms - self.mean) / self.count
+        self.recent.append(latency_ms)
+
 class FusionClassifier:
     """Hybrid Python (orchestrator) + C++ (inference) system"""
 
-    def __init__(self, cpp_host: str = "localhost", cpp_port: int = 8080):
-        self.cpp_endpoint = f"http://{cpp_host}:{cpp_port}/classify"
+    def __init__(self, session: aiohttp.ClientSession, cpp_host: str = "localhost", cpp_port: int = 8080):
+        # Pre-parsed URLs: aiohttp uses URL objects as-is instead of re-parsing per call
+        self.cpp_endpoint = URL(f"http://{cpp_host}:{cpp_port}/classify")
+        self.cpp_batch_endpoint = URL(f"http://{cpp_host}:{cpp_port}/classify_batch")
+        self.cpp_host = cpp_host
+        self.cpp_port = cpp_port
+        self._cpp_lock_fd: Optional[int] = None
         self.python_fallback = True
         self.metrics = {
             "total_requests": 0,
             "cpp_requests": 0,
             "python_fallbacks": 0,
-            "cpp_response_times": [],
-            "python_response_times": [],
+            "cache_hits": 0,
             "errors": 0
         }
+        self._cpp_latency = LatencyStats()
+        self._python_latency = LatencyStats()
         self._cpp_available = False
-        self._session = None
+        # Shared, process-wide session (owned by the FastAPI lifecycle)
+        self._session = session
+        # Pending C++ requests: (task, future) pairs drained by _batch_worker
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._batch_task: Optional[asyncio.Task] = None
+        self._cpp_slots = asyncio.Semaphore(CPP_BATCH_CONCURRENCY)
+        self._cpp_batches: set = set()
+        # Pending Python fallback requests, drained by _python_batch_worker
+        self._py_queue: asyncio.Queue = asyncio.Queue()
+        self._py_batch_task: Optional[asyncio.Task] = None
+        # sklearn/torch work runs here; one slot per thread bounds in-flight batches
+        self._py_exec = ThreadPoolExecutor(max_workers=PYTHON_ENGINE_THREADS, thread_name_prefix="python-engine")
+        self._py_slots = asyncio.Semaphore(PYTHON_ENGINE_THREADS)
+        self._py_batches: set = set()
+        # Python engine callables, bound once by _warm_python()
+        self._rag_classify_batch = None
+        self._map_to_bool = None
+        self._quadrant_names = None
+        # Results keyed by (task, force_python); in-flight work is shared (single-flight)
+        self._cache: "OrderedDict[Tuple[str, bool], Dict[str, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, bool], asyncio.Future] = {}
+        # RSS of this process and the C++ engine, refreshed by _sample_rss
+        self._self_proc = psutil.Process()
+        self._cpp_proc: Optional[psutil.Process] = None
+        self._rss_self_mb = 0.0
+        self._rss_cpp_mb = 0.0
+        self._rss_task: Optional[asyncio.Task] = None
 
     async def __aenter__(self):
         """Start C++ server if available"""
-        self._session = aiohttp.ClientSession()
         await self._start_cpp_engine()
+        await self._warm_python()
+        self._batch_task = asyncio.create_task(self._batch_worker())
+        self._py_batch_task = asyncio.create_task(self._python_batch_worker())
+        self._rss_task = asyncio.create_task(self._sample_rss())
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self._session.close()
+        for worker in (self._batch_task, self._py_batch_task, self._rss_task):
+            if worker:
+                worker.cancel()
+                try:
+                    await worker
+                except asyncio.CancelledError:
+                    pass
+        self._py_exec.shutdown(wait=False)
 
     async def _start_cpp_engine(self):
         """Start C++ inference engine"""
@@ -50,20 +198,31 @@ class FusionClassifier:
             logger.info("🔄 Attempting to start C++ engine...")
 
             # Check if already running
-            async with self._session.get(f"http://localhost:8080/health", timeout=aiohttp.ClientTimeout(total=2)) as resp:
-                if resp.status == 200:
-                    logger.info("✅ C++ engine already running")
-                    self._cpp_available = True
-                    return
+            if await self._cpp_port_open():
+                logger.info("✅ C++ engine already running")
+                self._cpp_available = True
+                return
 
         except Exception:
             pass
 
         # Try to start C++ server
         try:
-            # Kill any existing process on port 8080
-            subprocess.run(["pkill", "-f", "AIMatrixClassifier"], capture_output=True)
-            time.sleep(1)
+            # With several uvicorn workers only the lock holder spawns the engine
+            lock_fd = os.open(CPP_LOCK_PATH, os.O_CREAT | os.O_RDWR)
+            try:
+                fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(lock_fd)
+                logger.info("⏳ C++ engine is being started by another worker")
+                await self._wait_for_cpp_engine(watch_lock=True)
+                return
+
+            # Held for the lifetime of this process
+            self._cpp_lock_fd = lock_fd
+            stale_pid = _read_lock_state(os.pread(lock_fd, 4096, 0)).get("pid")
+            _write_lock_state(lock_fd, pid=None, status="starting")
+            await self._stop_stale_engine(stale_pid)
 
             # Start C++ server
             self.cpp_process = subprocess.Popen(
@@ -73,38 +232,149 @@ class FusionClassifier:
                 stderr=subprocess.PIPE,
                 text=True
             )
+            self._cpp_proc = psutil.Process(self.cpp_process.pid)
 
-            # Wait for startup
-            max_wait = 30
-            for i in range(max_wait):
-                try:
-                    async with self._session.get("http://localhost:8080/health", timeout=aiohttp.ClientTimeout(total=1)) as resp:
-                        if resp.status == 200:
-                            logger.info("🚀 C++ engine started successfully")
-                            self._cpp_available = True
-                            return
-                except Exception:
-                    if i % 5 == 0:
-                        logger.info(f"Waiting for C++ engine... ({i}/{max_wait}s)")
-                    await asyncio.sleep(1)
-
-            logger.error("❌ C++ engine failed to start")
-            self.python_fallback = True
+            # Record the engine pid for the next lock holder
+            _write_lock_state(lock_fd, pid=self.cpp_process.pid, status="starting")
+
+            started = await self._wait_for_cpp_engine()
+            _write_lock_state(
+                lock_fd, pid=self.cpp_process.pid, status="ok" if started else "failed",
+                reason=None if started else "engine did not accept connections in time"
+            )
 
         except Exception as e:
             logger.error(f"❌ Failed to start C++ engine: {e}")
             self.python_fallback = True
+            # Waiting workers read this and go Python-only right away
+            if self._cpp_lock_fd is not None:
+                try:
+                    _write_lock_state(self._cpp_lock_fd, pid=None, status="failed", reason=str(e))
+                except OSError:
+                    pass
+
+    async def _wait_for_cpp_engine(self, max_wait: int = 30, watch_lock: bool = False) -> bool:
+        """Poll the C++ engine port until it accepts connections
+
+        With watch_lock (workers not holding the lock), stop as soon as the lock
+        holder reports a failed start instead of polling for the full max_wait.
+        """
+        for i in range(max_wait):
+            if await self._cpp_port_open():
+                logger.info("🚀 C++ engine started successfully")
+                self._cpp_available = True
+                return True
+
+            if watch_lock:
+                state = _read_lock_state()
+                # A "failed" left by a dead owner is from an earlier run - only a live holder's counts
+                if state.get("status") == "failed" and psutil.pid_exists(state.get("owner") or 0):
+                    logger.warning(f"❌ C++ engine start failed in another worker ({state.get('reason')}), using Python only")
+                    self.python_fallback = True
+                    return False
+
+            if i % 5 == 0:
+                logger.info(f"Waiting for C++ engine... ({i}/{max_wait}s)")
+            await asyncio.sleep(1)
+
+        logger.error("❌ C++ engine failed to start")
+        self.python_fallback = True
+        return False
+
+    async def _stop_stale_engine(self, stale_pid: Optional[int]):
+        """Terminate an engine left behind by a previous lock holder (pid from the lock file)"""
+        if not stale_pid:
+            return
+
+        try:
+            stale = psutil.Process(int(stale_pid))
+            if "AIMatrixClassifier" in " ".join(stale.cmdline()):
+                stale.terminate()
+                await asyncio.to_thread(stale.wait, 1)
+        except (psutil.Error, OSError):
+            pass
+
+    async def _warm_python(self):
+        """Import the Python engine and load its model before the first fallback"""
+        try:
+            from main import get_model, map_to_bool, QUADRANT_NAMES, rag_classify_batch, warm_rag
+
+            self._rag_classify_batch = rag_classify_batch
+            self._map_to_bool = map_to_bool
+            self._quadrant_names = QUADRANT_NAMES
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._py_exec, get_model)
+            # main.py loads its embedding models lazily - pay that cost before serving traffic
+            await loop.run_in_executor(self._py_exec, warm_rag)
+            logger.info("✅ Python engine loaded")
+        except Exception as e:
+            logger.error(f"❌ Failed to load Python engine: {e}")
+
+    async def _cpp_port_open(self) -> bool:
+        """Check whether the C++ engine accepts TCP connections"""
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.cpp_host, self.cpp_port),
+                timeout=CPP_PROBE_TIMEOUT
+            )
+        except (OSError, asyncio.TimeoutError):
+            return False
+
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return True
 
     async def classify_hybrid(self, task: str, force_python: bool = False) -> Dict[str, Any]:
         """Intelligent routing: C++ for speed, Python for complexity"""
+        start_ns = time.perf_counter_ns()
         self.metrics["total_requests"] += 1
 
+        key = (task, force_python)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.metrics["cache_hits"] += 1
+            # A copy with this request's own timing - the cached entry stays untouched
+            return {
+                **cached,
+                "cached": True,
+                "latency_ms": (time.perf_counter_ns() - start_ns) // 1000 / 1000,
+                "timestamp": _NOW_ISO
+            }
+
+        # Concurrent requests for the same task wait on a single classification
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._classify_uncached(task, force_python))
+            self._inflight[key] = inflight
+            inflight.add_done_callback(lambda future: self._store_result(key, future))
+
+        # Every caller gets its own dict; the cache keeps the original
+        return dict(await asyncio.shield(inflight))
+
+    def _store_result(self, key: Tuple[str, bool], future: asyncio.Future):
+        """Move a finished classification from in-flight into the LRU cache"""
+        self._inflight.pop(key, None)
+        if future.cancelled() or future.exception() is not None:
+            return
+
+        self._cache[key] = future.result()
+        self._cache.move_to_end(key)
+        if len(self._cache) > RESULT_CACHE_MAX:
+            self._cache.popitem(last=False)
+
+    async def _classify_uncached(self, task: str, force_python: bool) -> Dict[str, Any]:
+        """Route a single task to the C++ or Python engine"""
         # Decision tree for routing
         should_use_cpp = (
             self._cpp_available and  # C++ is available
             not force_python and      # Not forced to use Python
-            len(task) < 1000 and      # Task not too long
-            not any(char in task for char in ['\n', '\t', '\r'])  # Simple text
+            len(task) < CPP_MAX_TASK_LENGTH and  # Task not too long
+            # Simple text: plain substring checks are single memchr scans, no generator
+            "\n" not in task and "\t" not in task and "\r" not in task
         )
 
         if should_use_cpp:
@@ -121,59 +391,89 @@ class FusionClassifier:
 
     async def _classify_with_cpp(self, task: str) -> Dict[str, Any]:
         """Fast C++ inference for simple cases"""
-        start_time = time.time()
-
-        payload = {"task": task}
-        async with self._session.post(
-            self.cpp_endpoint,
-            json=payload,
-            timeout=aiohttp.ClientTimeout(total=0.1)  # 100ms timeout
-        ) as response:
-            result = await response.json()
-
-            # Add metadata
-            result.update({
-                "engine": "C++ Inference Engine",
-                "latency_ms": round((time.time() - start_time) * 1000, 2),
-                "timestamp": datetime.now().isoformat(),
-                "hybrid_system": True
-            })
-
-            # Update metrics
-            self.metrics["cpp_requests"] += 1
-            self.metrics["cpp_response_times"].append(result["latency_ms"])
-
-            return result
+        start_ns = time.perf_counter_ns()
+
+        # Queue for the batch worker and wait for this task's slice of the batch
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((task, future))
+        result = await future
+
+        # Add metadata
+        result.update({
+            "engine": "C++ Inference Engine",
+            "latency_ms": (time.perf_counter_ns() - start_ns) // 1000 / 1000,  # µs resolution
+            "timestamp": _NOW_ISO,
+            "hybrid_system": True
+        })
+
+        # Update metrics
+        self.metrics["cpp_requests"] += 1
+        self._cpp_latency.record(result["latency_ms"])
+
+        return result
+
+    async def _batch_worker(self):
+        """Coalesce queued C++ requests into /classify_batch calls, several in flight at once"""
+        while True:
+            # While every slot is busy, requests keep queueing into a larger batch
+            await self._cpp_slots.acquire()
+            items = await _collect_batch(self._queue, CPP_BATCH_MAX, CPP_BATCH_WINDOW)
+
+            batch = asyncio.create_task(self._run_cpp_batch(items))
+            self._cpp_batches.add(batch)
+            batch.add_done_callback(self._cpp_batches.discard)
+
+    async def _run_cpp_batch(self, items: list):
+        """Send one batch to the C++ engine and resolve its futures"""
+        tasks = [task for task, _ in items]
+        # The session's 100ms covers one task - scale the deadline with the batch
+        timeout = aiohttp.ClientTimeout(total=CPP_TIMEOUT + CPP_TIMEOUT_PER_TASK * len(tasks))
+
+        try:
+            body = orjson.dumps({"tasks": tasks})
+            async with self._session.post(
+                self.cpp_batch_endpoint, data=body, headers=_JSON_HEADERS, timeout=timeout
+            ) as response:
+                response.raise_for_status()
+                results = orjson.loads(await response.read())["results"]
+            if len(results) != len(items):
+                raise ValueError(f"C++ batch returned {len(results)} results for {len(items)} tasks")
+        except Exception as e:
+            # Every caller falls back individually (see classify_hybrid)
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._cpp_slots.release()
+
+        for (_, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
 
     async def _classify_with_python(self, task: str) -> Dict[str, Any]:
         """Flexible Python processing for complex cases"""
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
 
-        # Import Python classifier (lazy loading)
-        if not hasattr(self, '_python_classifier'):
-            from main import get_model, map_to_bool, QUADRANT_NAMES, rag_classify
-
-            self._python_classifier = {
-                'get_model': get_model,
-                'map_to_bool': map_to_bool,
-                'QUADRANT_NAMES': QUADRANT_NAMES,
-                'rag_classify': rag_classify
-            }
+        if self._rag_classify_batch is None:
+            raise RuntimeError("Python engine not loaded")
 
-        # Run Python RAG classification
-        rag_result = self._python_classifier['rag_classify'](task)
+        # Run Python RAG classification (coalesced with concurrent requests)
+        future = asyncio.get_running_loop().create_future()
+        await self._py_queue.put((task, future))
+        rag_result = await future
         quadrant = rag_result["prediction"]
-        urgent, important = self._python_classifier['map_to_bool'](quadrant)
+        urgent, important = self._map_to_bool(quadrant)
 
         result = {
             "task": task,
             "urgent": urgent,
             "important": important,
             "quadrant": quadrant,
-            "quadrant_name": self._python_classifier['QUADRANT_NAMES'][quadrant],
+            "quadrant_name": self._quadrant_names[quadrant],
             "engine": "Python RAG Engine",
-            "latency_ms": round((time.time() - start_time) * 1000, 2),
-            "timestamp": datetime.now().isoformat(),
+            "latency_ms": (time.perf_counter_ns() - start_ns) // 1000 / 1000,  # µs resolution
+            "timestamp": _NOW_ISO,
             "hybrid_system": True,
             "confidence": rag_result["confidence"],
             "rag_influence": rag_result["rag_influence"],
@@ -182,15 +482,42 @@ class FusionClassifier:
 
         # Update metrics
         self.metrics["python_fallbacks"] += 1
-        self.metrics["python_response_times"].append(result["latency_ms"])
+        self._python_latency.record(result["latency_ms"])
 
         return result
 
+    async def _python_batch_worker(self):
+        """Coalesce queued Python fallback requests into one rag_classify_batch call"""
+        while True:
+            # While every engine thread is busy, requests keep queueing into a larger batch
+            await self._py_slots.acquire()
+            items = await _collect_batch(self._py_queue, PYTHON_BATCH_MAX, PYTHON_BATCH_WINDOW)
+
+            batch = asyncio.create_task(self._run_python_batch(items))
+            self._py_batches.add(batch)
+            batch.add_done_callback(self._py_batches.discard)
+
+    async def _run_python_batch(self, items: list):
+        """Classify one batch on the engine thread pool and resolve its futures"""
+        tasks = [task for task, _ in items]
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self._py_exec, self._rag_classify_batch, tasks
+            )
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._py_slots.release()
+
+        for (_, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
+
     def get_metrics(self) -> Dict[str, Any]:
         """Get hybrid system performance metrics"""
-        cpp_avg = np.mean(self.metrics["cpp_response_times"]) if self.metrics["cpp_response_times"] else 0
-        python_avg = np.mean(self.metrics["python_response_times"]) if self.metrics["python_response_times"] else 0
-
         return {
             "system_status": {
                 "cpp_available": self._cpp_available,
@@ -200,60 +527,96 @@ class FusionClassifier:
                 "total_requests": self.metrics["total_requests"],
                 "cpp_requests": self.metrics["cpp_requests"],
                 "python_requests": self.metrics["python_fallbacks"],
-                "cpp_hit_rate": self.metrics["cpp_requests"] / max(self.metrics["total_requests"], 1),
-                "avg_cpp_latency_ms": round(cpp_avg, 2),
-                "avg_python_latency_ms": round(python_avg, 2),
+                "cache_hits": self.metrics["cache_hits"],
+                # Share of engine-classified requests served by C++ - cache hits and
+                # single-flight joiners never reach an engine, so they are left out
+                "cpp_hit_rate": self.metrics["cpp_requests"] / max(
+                    self.metrics["cpp_requests"] + self.metrics["python_fallbacks"], 1
+                ),
+                "avg_cpp_latency_ms": round(self._cpp_latency.mean, 2),
+                "avg_python_latency_ms": round(self._python_latency.mean, 2),
                 "errors": self.metrics["errors"]
             },
             "memory_usage": {
-                "current_mb": psutil.Process().memory_info().rss / 1024 / 1024,
-                "cpp_process": self._get_cpp_memory() if hasattr(self, 'cpp_process') else 0
+                "current_mb": self._rss_self_mb,
+                "cpp_process": self._rss_cpp_mb
             }
         }
 
-    def _get_cpp_memory(self) -> float:
-        """Get C++ process memory usage"""
-        try:
-            if hasattr(self, 'cpp_process') and self.cpp_process.poll() is None:
-                proc = psutil.Process(self.cpp_process.pid)
-                return proc.memory_info().rss / 1024 / 1024
-        except Exception:
-            pass
-        return 0
+    async def _sample_rss(self):
+        """Refresh cached RSS figures so /metrics never touches /proc itself"""
+        while True:
+            self._rss_self_mb = self._self_proc.memory_info().rss / 1024 / 1024
+            try:
+                if self._cpp_proc is not None and self.cpp_process.poll() is None:
+                    self._rss_cpp_mb = self._cpp_proc.memory_info().rss / 1024 / 1024
+                else:
+                    self._rss_cpp_mb = 0
+            except psutil.Error:
+                self._rss_cpp_mb = 0
+            await asyncio.sleep(RSS_SAMPLE_INTERVAL)
 
 # FastAPI server for hybrid system
 from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import BaseModel
 
 fusion_app = FastAPI(
     title="AI Matrix Classifier - Hybrid Python+C++ System",
-    description="Intelligent fusion of Python flexibility and C++ performance"
+    description="Intelligent fusion of Python flexibility and C++ performance",
+    default_response_class=ORJSONResponse
 )
 
+class ClassifyRequest(BaseModel):
+    """JSON body of POST /classify"""
+    task: str
+    force_engine: Optional[str] = None
+
 # Global fusion classifier
 fusion_classifier: Optional[FusionClassifier] = None
 
+# Long-lived HTTP session for the C++ engine (keep-alive connection pool)
+_SESSION: Optional[aiohttp.ClientSession] = None
+_CLOCK_TASK: Optional[asyncio.Task] = None
+
 @fusion_app.on_event("startup")
 async def startup_event():
     """Initialize hybrid system"""
-    global fusion_classifier
-    fusion_classifier = FusionClassifier()
+    global fusion_classifier, _SESSION, _CLOCK_TASK
+    _CLOCK_TASK = asyncio.create_task(_tick())
+    _SESSION = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=256,
+            limit_per_host=128,
+            keepalive_timeout=60,
+            enable_cleanup_closed=True
+        ),
+        timeout=aiohttp.ClientTimeout(total=CPP_TIMEOUT)  # 100ms timeout (batches scale their own)
+    )
+    fusion_classifier = FusionClassifier(_SESSION)
     await fusion_classifier.__aenter__()
     logger.info("🌟 Hybrid AI System initialized")
 
 @fusion_app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup resources"""
-    global fusion_classifier
+    global fusion_classifier, _SESSION, _CLOCK_TASK
     if fusion_classifier:
         await fusion_classifier.__aexit__(None, None, None)
+    if _SESSION:
+        await _SESSION.close()
+        _SESSION = None
+    if _CLOCK_TASK:
+        _CLOCK_TASK.cancel()
+        _CLOCK_TASK = None
     logger.info("🔄 Hybrid AI System shut down")
 
 @fusion_app.post("/classify")
-async def classify_endpoint(task: str, force_engine: Optional[str] = None):
+async def classify_endpoint(request: ClassifyRequest):
     """
     Intelligent task classification using hybrid Python+C++ system
 
+    JSON body:
     - **task**: Task description to classify
     - **force_engine**: 'cpp' or 'python' to force specific engine
     """
@@ -264,9 +627,11 @@ async def classify_endpoint(task: str, force_engine: Optional[str] = None):
         )
 
     try:
-        force_python = force_engine == "python"
-        result = await fusion_classifier.classify_hybrid(task, force_python)
-        return result
+        force_python = request.force_engine == "python"
+        result = await fusion_classifier.classify_hybrid(request.task, force_python)
+        # Results hold only JSON-native values: hand them to orjson directly and
+        # skip FastAPI's jsonable_encoder walk over the dict
+        return ORJSONResponse(result)
 
     except Exception as e:
         logger.error(f"Classification error: {e}")
@@ -293,7 +658,7 @@ async def health_check():
         "status": "healthy",
         "hybrid_system": True,
         "cpp_available": fusion_classifier._cpp_available if fusion_classifier else False,
-        "timestamp": datetime.now().isoformat()
+        "timestamp": _NOW_ISO
     }
 
 @fusion_app.post("/fine-tune")
@@ -331,10 +696,22 @@ if __name__ == "__main__":
     print("   Port: 8090 (Python), 8080 (C++)")
     print("")
 
-    uvicorn.run(
-        "fusion_server:fusion_app",
-        host="0.0.0.0",
-        port=8090,
-        reload=True,
-        log_level="info"
-    )
+    if os.getenv("DEV"):
+        # Development: auto-reload (single process, default event loop)
+        uvicorn.run(
+            "fusion_server:fusion_app",
+            host="0.0.0.0",
+            port=8090,
+            reload=True,
+            log_level="info"
+        )
+    else:
+        uvicorn.run(
+            "fusion_server:fusion_app",
+            host="0.0.0.0",
+            port=8090,
+            loop="uvloop",
+            http="httptools",
+            workers=int(os.getenv("WORKERS", "4")),
+            log_level="warning"
+        )
@@ -313,6 +313,31 @@ public:
     }
 };
 
+// Shared classifier instance for all HTTP controllers
+TaskClassifier& get_global_classifier() {
+    static TaskClassifier* global_classifier = nullptr;
+    static std::once_flag init_flag;
+    std::call_once(init_flag, [] {
+        Config config;
+        global_classifier = new TaskClassifier(config);
+    });
+    return *global_classifier;
+}
+
+Json::Value build_classification(TaskClassifier& classifier, const std::string& task) {
+    int quadrant = classifier.classify_task(task);
+
+    Json::Value result;
+    result["task"] = task;
+    result["urgent"] = quadrant == 0 || quadrant == 1;
+    result["important"] = quadrant == 0 || quadrant == 2;
+    result["quadrant"] = quadrant;
+    result["quadrant_name"] = classifier.get_quadrant_name(quadrant);
+    result["method"] = "C++ RAG Classifier";
+    result["performance"] = "High-throughput";
+    return result;
+}
+
 // HTTP Controllers (Drogon)
 class ClassificationController : public drogon::HttpSimpleController<ClassificationController> {
 public:
@@ -336,26 +361,42 @@ public:
         std::string task = json_body->get("task", "").asString();
 
         // Classify task (using global classifier instance)
-        static TaskClassifier* global_classifier = nullptr;
-        if (!global_classifier) {
-            Config config;
-            global_classifier = new TaskClassifier(config);
-        }
+        Json::Value response = build_classification(get_global_classifier(), task);
 
-        int quadrant = global_classifier->classify_task(task);
-        std::string quadrant_name = global_classifier->get_quadrant_name(quadrant);
+        auto resp = drogon::HttpResponse::newHttpJsonResponse(response);
+        callback(resp);
+    }
+};
 
-        bool urgent = quadrant == 0 || quadrant == 1;
-        bool important = quadrant == 0 || quadrant == 2;
+// Micro-batched classification: one HTTP round-trip for many tasks
+class BatchClassificationController : public drogon::HttpSimpleController<BatchClassificationController> {
+public:
+    PATH_LIST_BEGIN
+        PATH_ADD("/classify_batch", Post);
+    PATH_LIST_END
 
+    void asyncHandleHttpRequest(const drogon::HttpRequestPtr& req,
+                               std::function<void(const drogon::HttpResponsePtr&)>&& callback) override {
+
+        auto json_body = req->getJsonObject();
+        if (!json_body || !json_body->isMember("tasks") || !(*json_body)["tasks"].isArray()) {
+            Json::Value error;
+            error["error"] = "Missing 'tasks' array";
+            auto resp = drogon::HttpResponse::newHttpJsonResponse(error);
+            resp->setStatusCode(k400BadRequest);
+            callback(resp);
+            return;
+        }
+
+        TaskClassifier& classifier = get_global_classifier();
+        const Json::Value& tasks = (*json_body)["tasks"];
+
+        // Results keep the order of the incoming tasks
         Json::Value response;
-        response["task"] = task;
-        response["urgent"] = urgent;
-        response["important"] = important;
-        response["quadrant"] = quadrant;
-        response["quadrant_name"] = quadrant_name;
-        response["method"] = "C++ RAG Classifier";
-        response["performance"] = "High-throughput";
+        response["results"] = Json::Value(Json::arrayValue);
+        for (const auto& task : tasks) {
+            response["results"].append(build_classification(classifier, task.asString()));
+        }
 
         auto resp = drogon::HttpResponse::newHttpJsonResponse(response);
         callback(resp);
@@ -377,6 +418,7 @@ int main() {
     std::cout << "🎯 Server starting on :8080" << std::endl;
     std::cout << "   Endpoints:" << std::endl;
     std::cout << "   POST /classify {\"task\": \"your task here\"}" << std::endl;
+    std::cout << "   POST /classify_batch {\"tasks\": [\"task 1\", \"task 2\"]}" << std::endl;
     std::cout << std::endl;
 
     // Start Drogon web server
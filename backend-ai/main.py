@@ -1,50 +1,293 @@
 from fastapi import FastAPI, Query, HTTPException, UploadFile, File
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
-from sklearn.pipeline import Pipeline
-from sklearn.metrics.pairwise import cosine_similarity
-from sentence_transformers import SentenceTransformer, CrossEncoder
+from fastapi.concurrency import run_in_threadpool
 import chromadb
 from typing import List, Dict, Optional, Tuple
-import joblib
+from dataclasses import dataclass
 import os
+import re
 import json
+import hashlib
+import sqlite3
+import threading
+import itertools
+import contextlib
+import importlib.util
+from collections import OrderedDict
+from functools import wraps
 import numpy as np
 from datetime import datetime
-import pandas as pd
 from pathlib import Path
 
-# New imports for LangChain and OpenCV
-from langchain.chains import LLMChain
-from langchain.prompts import PromptTemplate
-from langchain.llms import HuggingFacePipeline
-from langchain.memory import ConversationBufferMemory
-import cv2
-import pytesseract
+try:
+    import orjson  # Fast JSON for the training corpus; stdlib json is the fallback
+except ImportError:
+    orjson = None
+
+# torch/transformers/sentence_transformers/langchain/cv2 are imported inside lazy
+# getters below, so processes only pay for them when an endpoint needs them
 import io
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+from ocr import _init_tess, _ocr_one
+
+def _load_once(loader):
+    """Cache a zero-argument loader's result; concurrent first calls wait for a single load
+
+    (lru_cache alone lets every thread that arrives before the first load finishes run the loader.)
+    """
+    lock = threading.Lock()
+    result = []
+
+    @wraps(loader)
+    def wrapper():
+        if not result:
+            with lock:
+                if not result:
+                    result.append(loader())
+        return result[0]
+
+    wrapper.loaded = lambda: bool(result)
+    return wrapper
+
+# Preloaded Tesseract API (no subprocess per image); pytesseract remains the fallback
+_tess_lock = threading.Lock()  # PyTessBaseAPI is not thread-safe
+
+@_load_once
+def _get_tess_api():
+    """Tesseract API loaded on first OCR request, None if tesserocr is unavailable"""
+    try:
+        import tesserocr
+        api = tesserocr.PyTessBaseAPI(lang='pol+eng', psm=tesserocr.PSM.AUTO)
+        print("✅ Tesseract API załadowane")
+        return api
+    except Exception as e:
+        print(f"⚠️ tesserocr niedostępny, używam pytesseract: {e}")
+        return None
 
 # Phase 1: BERT Embeddings Setup
-print("🔄 Ładowanie BERT embeddings...")
-try:
-    # Multi-language BERT for Polish + English
-    sentence_model = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')
-    print("✅ BERT embeddings załadowany")
-except Exception as e:
-    print(f"⚠️ Błąd ładowania BERT: {e}")
-    sentence_model = None
+SENTENCE_MODEL_NAME = 'paraphrase-multilingual-MiniLM-L12-v2'
+SENTENCE_MODEL_ONNX_FILE = os.getenv("SENTENCE_MODEL_ONNX_FILE", "onnx/model_qint8_avx512_vnni.onnx")
+# bfloat16 weights for the PyTorch fallback - only worth it on CPUs with native BF16 (AVX512-BF16/AMX)
+SENTENCE_MODEL_BF16 = os.getenv("SENTENCE_MODEL_BF16", "0") == "1"
+CROSS_ENCODER_NAME = 'cross-encoder/ms-marco-MiniLM-L6-v2'
+CROSS_ENCODER_ONNX_FILE = os.getenv("CROSS_ENCODER_ONNX_FILE", "onnx/model_qint8_avx512_vnni.onnx")
+CROSS_ENCODER_MAX_LENGTH = 128  # Task titles + query fit comfortably, caps padding per pair
+# Candidates retrieved for reranking - each one costs a cross-encoder forward, 5 are kept afterwards
+RERANK_FANOUT = max(5, int(os.getenv("RERANK_FANOUT", 6)))
+TORCH_THREADS = int(os.getenv("TORCH_NUM_THREADS", os.getenv("OMP_NUM_THREADS", max(1, (os.cpu_count() or 2) // 2))))
+
+_torch_inference = contextlib.nullcontext  # torch.inference_mode once a PyTorch model is loaded
+# Backend/precision of the loaded sentence model (e.g. "onnx-model_qint8_avx512_vnni", "torch-float32").
+# Part of every persisted embedding key: vectors from different backends are never mixed.
+_sentence_backend: Optional[str] = None
+
+@_load_once
+def _configure_torch():
+    """Pin PyTorch thread pools (once, before the first forward pass) and return torch"""
+    global _torch_inference
+    import torch
+    torch.set_num_threads(TORCH_THREADS)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # Inter-op pool already started
+    _torch_inference = torch.inference_mode
+    return torch
+
+@_load_once
+def _get_sentence_model():
+    """BERT embeddings loaded on first use, None if unavailable"""
+    global _sentence_backend
+    print("🔄 Ładowanie BERT embeddings...")
+    try:
+        from sentence_transformers import SentenceTransformer
+
+        # Multi-language BERT for Polish + English - int8 ONNX Runtime on CPU, PyTorch as fallback
+        try:
+            sentence_model = SentenceTransformer(
+                SENTENCE_MODEL_NAME, backend="onnx", model_kwargs={"file_name": SENTENCE_MODEL_ONNX_FILE}
+            )
+            _sentence_backend = f"onnx-{Path(SENTENCE_MODEL_ONNX_FILE).stem}"
+            print("✅ BERT embeddings załadowany (ONNX int8)")
+        except Exception as e:
+            print(f"⚠️ ONNX niedostępny ({e}), używam PyTorch - embeddingi z ONNX nie będą ponownie użyte")
+            torch = _configure_torch()
+            # Corpus (re)builds go through one encode call - on a GPU host that call runs there
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+            sentence_model = SentenceTransformer(SENTENCE_MODEL_NAME, device=device).eval()
+            if SENTENCE_MODEL_BF16:
+                sentence_model = sentence_model.to(dtype=torch.bfloat16)
+            _sentence_backend = f"torch-{'bfloat16' if SENTENCE_MODEL_BF16 else 'float32'}"
+            print(f"✅ BERT embeddings załadowany ({_sentence_backend})")
+        return sentence_model
+    except Exception as e:
+        print(f"⚠️ Błąd ładowania BERT: {e}")
+        return None
+
+# Embedding cache: SHA-256 of backend tag + normalized text -> L2-normalized float32 vector,
+# LRU in memory and persisted in SQLite (emb_norm table; unit vectors make cosine a dot product)
+EMB_CACHE_PATH = "emb_cache.sqlite"
+EMB_CACHE_MAX = 50_000
+_emb_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+_emb_cache_lock = threading.Lock()
+_emb_db = None
+
+def _get_emb_db() -> sqlite3.Connection:
+    global _emb_db
+    if _emb_db is None:
+        _emb_db = sqlite3.connect(EMB_CACHE_PATH, check_same_thread=False)
+        _emb_db.execute("CREATE TABLE IF NOT EXISTS emb_norm (key BLOB PRIMARY KEY, vec BLOB)")
+    return _emb_db
+
+def _embedding_backend() -> Optional[str]:
+    """Backend tag of the sentence model (loading it if needed), None when BERT is unavailable"""
+    _get_sentence_model()
+    return _sentence_backend
+
+def _emb_key(text: str, backend: Optional[str]) -> bytes:
+    return hashlib.sha256(f"{backend}\0{text.strip().lower()}".encode()).digest()
+
+def encode_cached(texts: List[str]) -> np.ndarray:
+    """Encode texts (L2-normalized) with the sentence model, reusing embeddings of already seen texts"""
+    backend = _embedding_backend()
+    keys = [_emb_key(text, backend) for text in texts]
+    vectors: Dict[bytes, np.ndarray] = {}
+
+    with _emb_cache_lock:
+        for key in keys:
+            vec = _emb_cache.get(key)
+            if vec is not None:
+                _emb_cache.move_to_end(key)
+                vectors[key] = vec
+
+        lookup = [key for key in dict.fromkeys(keys) if key not in vectors]
+        if lookup:
+            db = _get_emb_db()
+            for i in range(0, len(lookup), 500):
+                chunk = lookup[i:i+500]
+                rows = db.execute(
+                    f"SELECT key, vec FROM emb_norm WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    vectors[key] = np.frombuffer(blob, dtype=np.float32)
+
+    # Only texts never seen before go through the model
+    misses: Dict[bytes, str] = {}
+    for key, text in zip(keys, texts):
+        if key not in vectors:
+            misses.setdefault(key, text)
+    if misses:
+        with _torch_inference():
+            encoded = _get_sentence_model().encode(
+                list(misses.values()), batch_size=64, convert_to_numpy=True, normalize_embeddings=True,
+                show_progress_bar=False
+            )
+        encoded = encoded.astype(np.float32, copy=False)
+        vectors.update(zip(misses.keys(), encoded))
+
+    with _emb_cache_lock:
+        if misses:
+            db = _get_emb_db()
+            db.executemany(
+                "INSERT OR REPLACE INTO emb_norm (key, vec) VALUES (?, ?)",
+                [(key, vectors[key].tobytes()) for key in misses]
+            )
+            db.commit()
+        for key in dict.fromkeys(keys):
+            _emb_cache[key] = vectors[key]
+            _emb_cache.move_to_end(key)
+        while len(_emb_cache) > EMB_CACHE_MAX:
+            _emb_cache.popitem(last=False)
+
+    return np.stack([vectors[key] for key in keys])
+
+def _encode_queries(texts: List[str]) -> List[Optional[np.ndarray]]:
+    """Batch encode for MicroBatcher; None per text when BERT is unavailable"""
+    if _get_sentence_model() is None:
+        return [None] * len(texts)
+    return list(encode_cached(texts))
+
+class MicroBatcher:
+    """Coalesce query embeddings of concurrent requests into one batched encode"""
+
+    def __init__(self, max_batch: int = 32, max_wait: float = 0.005):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._runner())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, text: str) -> Optional[np.ndarray]:
+        """Embedding of text (None without BERT), computed together with concurrent submits"""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((text, future))
+        return await future
+
+    async def _runner(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                # Encode off the event loop; requests arriving meanwhile form the next batch
+                embeddings = await loop.run_in_executor(None, _encode_queries, [text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), embedding in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(embedding)
 
 # Phase 2: Vector Database Setup
 VECTOR_DB_PATH = "chroma_db"
+VECTOR_COLLECTION_NAME = "task_examples"
+# Cosine HNSW space - matches the similarity used by the in-process BERT path
+# HNSW graph parameters: M and construction_ef are fixed at creation, search_ef is the query-time beam
+VECTOR_COLLECTION_METADATA = {"hnsw:space": "cosine", "hnsw:M": 24, "hnsw:construction_ef": 128, "hnsw:search_ef": 100}
+
+def _open_collection(client):
+    """Open the task collection, recreating it if it was built with another distance or HNSW parameters"""
+    coll = client.get_or_create_collection(name=VECTOR_COLLECTION_NAME, metadata=VECTOR_COLLECTION_METADATA)
+    metadata = coll.metadata or {}
+    if any(metadata.get(key) != value for key, value in VECTOR_COLLECTION_METADATA.items()):
+        # Legacy L2 / untuned collection - emptied here, refilled by update_vector_db_with_new_data
+        client.delete_collection(name=VECTOR_COLLECTION_NAME)
+        coll = client.create_collection(name=VECTOR_COLLECTION_NAME, metadata=VECTOR_COLLECTION_METADATA)
+    return coll
+
+collection = None
 try:
     chroma_client = chromadb.PersistentClient(path=VECTOR_DB_PATH)
-    collection = chroma_client.get_or_create_collection(name="task_examples")
+    collection = _open_collection(chroma_client)
     print("✅ Vector database połączona")
 except Exception as e:
     print(f"⚠️ Błąd vector database: {e}")
     chroma_client = None
 
 # LangChain initialization
-langchain_memory = ConversationBufferMemory()
 langchain_template = """
 You are an expert task management and Eisenhower Matrix consultant. Analyze the following task and provide detailed reasoning about where it should be placed in the Eisenhower Matrix.
 
@@ -63,33 +306,51 @@ Based on your analysis, recommend one of these quadrants:
 Provide your final recommendation as a number (0-3) and detailed reasoning.
 """
 
-try:
-    langchain_prompt = PromptTemplate(
-        input_variables=["task"],
-        template=langchain_template
-    )
+# Quadrant mentions in LLM output: "Quadrant N" or the quadrant's action name,
+# plus the labels that mark reasoning lines (group 2)
+_QUAD_RE = re.compile(
+    r'quadrant\s*([0-3])|do now|schedule|delegate|delete|(reasoning:|analysis:|consider:)', re.IGNORECASE
+)
+_QUAD_KEYWORDS = {'do now': 0, 'schedule': 1, 'delegate': 2, 'delete': 3}
+_QUAD_DIGIT_RE = re.compile(r'\b[0-3]\b')
 
-    # Initialize HuggingFace model for LangChain
-    hf_model_id = "microsoft/DialoGPT-medium"
-    hf_pipeline = None
-    langchain_llm = None
+_langchain_lock = threading.Lock()  # One shared HF generation pipeline - not safe to run concurrently
 
+@_load_once
+def _get_langchain_chain():
+    """LangChain chain over a HuggingFace model, built on first use; None if unavailable"""
     try:
+        from langchain.chains import LLMChain
+        from langchain.prompts import PromptTemplate
+        from langchain.llms import HuggingFacePipeline
+
+        langchain_prompt = PromptTemplate(
+            input_variables=["task"],
+            template=langchain_template
+        )
+
+        # Initialize HuggingFace model for LangChain
+        hf_model_id = "microsoft/DialoGPT-medium"
+
         from transformers import pipeline
         hf_pipeline = pipeline("text-generation", model=hf_model_id, max_length=512, temperature=0.7, do_sample=True)
         langchain_llm = HuggingFacePipeline(pipeline=hf_pipeline)
         print("✅ LangChain initialized with HuggingFace model")
+
+        # No conversation memory: each task is classified on its own, prompt length stays constant
+        return LLMChain(
+            llm=langchain_llm,
+            prompt=langchain_prompt,
+            verbose=False
+        )
     except Exception as e:
         print(f"⚠️ LangChain initialization failed: {e}")
-        langchain_llm = None
-
-except Exception as e:
-    print(f"⚠️ LangChain setup error: {e}")
-    langchain_llm = None
+        return None
 
 def analyze_task_with_langchain(task: str) -> Dict:
     """Use LangChain to perform advanced task analysis"""
-    if langchain_llm is None or langchain_prompt is None:
+    chain = _get_langchain_chain()
+    if chain is None:
         return {
             "error": "LangChain not available",
             "quadrant": -1,
@@ -97,47 +358,39 @@ def analyze_task_with_langchain(task: str) -> Dict:
         }
 
     try:
-        chain = LLMChain(
-            llm=langchain_llm,
-            prompt=langchain_prompt,
-            memory=langchain_memory,
-            verbose=False
-        )
-
-        response = chain.run(task=task)
-
-        # Parse the response for quadrant recommendation
-        lines = response.strip().split('\n')
-        quadrant = -1
+        # Generation is serialized: /batch-analyze and /analyze-langchain share the pipeline across threads
+        with _langchain_lock:
+            response = chain.run(task=task)
+
+        # Parse the response for quadrant recommendation - one regex scan,
+        # later mentions override earlier ones (the final recommendation comes last).
+        # The same scan collects the first 3 lines holding a mention or a reasoning label
+        match = None
         reasoning_parts = []
+        last_line_start = -1
+        for found in _QUAD_RE.finditer(response):
+            line_start = response.rfind('\n', 0, found.start()) + 1
+            if line_start != last_line_start and len(reasoning_parts) < 3:
+                line_end = response.find('\n', found.end())
+                reasoning_parts.append(response[line_start:line_end if line_end != -1 else len(response)].strip())
+                last_line_start = line_start
+            if found.group(2) is None:
+                match = found
 
-        for line in lines:
-            line_lower = line.lower()
-            if 'quadrant 0' in line_lower or 'do now' in line_lower:
-                quadrant = 0
-                reasoning_parts.append(line)
-            elif 'quadrant 1' in line_lower or 'schedule' in line_lower:
-                quadrant = 1
-                reasoning_parts.append(line)
-            elif 'quadrant 2' in line_lower or 'delegate' in line_lower:
-                quadrant = 2
-                reasoning_parts.append(line)
-            elif 'quadrant 3' in line_lower or 'delete' in line_lower:
-                quadrant = 3
-                reasoning_parts.append(line)
-            elif any(keyword in line_lower for keyword in ['reasoning:', 'analysis:', 'consider:']):
-                reasoning_parts.append(line)
-
-        if quadrant == -1:
-            # Fallback to first numeric digit found
-            import re
-            numbers = re.findall(r'\b\d+\b', response)
-            if numbers:
-                quadrant = min(int(num) for num in numbers if 0 <= int(num) <= 3)
+        quadrant = -1
+        reasoning = " ".join(reasoning_parts)
+        if match is not None:
+            digit = match.group(1)
+            quadrant = int(digit) if digit is not None else _QUAD_KEYWORDS[match.group(0).lower()]
+        else:
+            # Fallback to the lowest standalone quadrant digit found
+            digits = _QUAD_DIGIT_RE.findall(response)
+            if digits:
+                quadrant = min(int(digit) for digit in digits)
 
         return {
             "quadrant": quadrant,
-            "reasoning": " ".join(reasoning_parts[:3]),  # Limit to first 3 reasoning points
+            "reasoning": reasoning,
             "full_reasoning": response,
             "confidence": 0.6 if quadrant >= 0 else 0.0,
             "method": "LangChain"
@@ -152,44 +405,60 @@ def analyze_task_with_langchain(task: str) -> Dict:
             "method": "LangChain"
         }
 
+# Task-like OCR line: not a URL, starts uppercase or contains a list/task marker, >5 chars once stripped
+_TASK_RE = re.compile(
+    r'^[^\S\n]*(?!http)'
+    r'(?=[A-ZĄĆĘŁŃÓŚŹŻ]|[^\n]*(?:[-•*✓☐]|(?i:todo|task)))'
+    r'(\S[^\n]{4,}\S)[^\S\n]*$',
+    re.MULTILINE
+)
+
+def find_potential_tasks(extracted_text: str) -> List[str]:
+    """Lines of OCR output that look like tasks (simple heuristics, one regex scan)"""
+    # Limit to 10 most promising tasks - stop scanning once found
+    return [match.group(1) for match in itertools.islice(_TASK_RE.finditer(extracted_text), 10)]
+
 def extract_text_from_image(image_data: bytes) -> Dict:
     """Use OpenCV and Tesseract to extract text from images"""
     try:
-        # Convert bytes to numpy array
-        nparr = np.frombuffer(image_data, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-
-        if img is None:
-            return {"error": "Invalid image format", "text": "", "tasks": []}
-
-        # Preprocessing for better OCR
-        # Convert to grayscale
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-
-        # Apply thresholding to get better contrast
-        _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        tess_api = _get_tess_api()
+        if tess_api is not None:
+            from PIL import Image
+
+            # Tesseract binarizes internally - hand it the grayscale image directly
+            try:
+                pil_img = Image.open(io.BytesIO(image_data)).convert('L')
+            except OSError:
+                return {"error": "Invalid image format", "text": "", "tasks": []}
+
+            with _tess_lock:
+                tess_api.SetImage(pil_img)
+                extracted_text = tess_api.GetUTF8Text()
+            image_shape = f"{pil_img.height}x{pil_img.width}"
+            method = "Tesseract API"
+        else:
+            import cv2
+            import pytesseract
 
-        # Use pytesseract for OCR with Polish language support
-        extracted_text = pytesseract.image_to_string(thresh, lang='pol+eng', config='--psm 3')
+            # Convert bytes to numpy array
+            nparr = np.frombuffer(image_data, np.uint8)
+            # Decode straight to grayscale - the decoder skips chroma, 1 byte per pixel
+            img = cv2.imdecode(nparr, cv2.IMREAD_GRAYSCALE)
 
-        # Split into potential tasks (simple heuristics)
-        lines = [line.strip() for line in extracted_text.split('\n') if line.strip()]
-        potential_tasks = []
+            if img is None:
+                return {"error": "Invalid image format", "text": "", "tasks": []}
 
-        # Simple task detection (lines that look like tasks)
-        for line in lines:
-            line = line.strip()
-            if len(line) > 5 and not line.startswith('http'):  # Filter out URLs
-                # Look for task-like patterns
-                task_indicators = ['-', '•', '*', 'todo', 'task', '✓', '☐']
-                if any(indicator in line.lower() or line[0].isupper() for indicator in task_indicators):
-                    potential_tasks.append(line)
+            # Use pytesseract for OCR with Polish language support
+            # (Tesseract applies Otsu binarization itself - no separate threshold pass over the image)
+            extracted_text = pytesseract.image_to_string(img, lang='pol+eng', config='--psm 3')
+            image_shape = f"{img.shape[0]}x{img.shape[1]}"
+            method = "OpenCV+Tesseract"
 
         return {
             "extracted_text": extracted_text,
-            "tasks": potential_tasks[:10],  # Limit to 10 most promising tasks
-            "image_shape": f"{img.shape[0]}x{img.shape[1]}",
-            "method": "OpenCV+Tesseract"
+            "tasks": find_potential_tasks(extracted_text),
+            "image_shape": image_shape,
+            "method": method
         }
 
     except Exception as e:
@@ -201,171 +470,305 @@ def extract_text_from_image(image_data: bytes) -> Dict:
 
 app = FastAPI(title="AI Quadrant Classifier", description="Intelligent task classification with continuous learning")
 
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+MAX_IMAGE_BYTES = 10 * 1024 * 1024  # Per-upload cap for the OCR endpoints
+MAX_OCR_FILES = int(os.getenv("MAX_OCR_FILES", 20))  # Images per /ocr-batch request
+
+@app.on_event("startup")
+def start_ocr_pool():
+    """Pre-warmed Tesseract worker processes for /ocr-batch"""
+    # spawn: workers import only ocr.py instead of inheriting the torch/BERT state of this process
+    app.state.ocr_pool = ProcessPoolExecutor(
+        max_workers=OCR_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_tess
+    )
+    # Workers only spawn on submit - one no-op per worker runs _init_tess now, not in the first request
+    wait([app.state.ocr_pool.submit(int) for _ in range(OCR_WORKERS)])
+
+@app.on_event("shutdown")
+def stop_ocr_pool():
+    app.state.ocr_pool.shutdown(wait=False, cancel_futures=True)
+
+@app.on_event("startup")
+async def start_embed_batcher():
+    """Micro-batcher for query embeddings of concurrent /classify requests"""
+    app.state.embed_batcher = MicroBatcher()
+    app.state.embed_batcher.start()
+
+@app.on_event("shutdown")
+async def stop_embed_batcher():
+    await app.state.embed_batcher.stop()
+
 model_path = 'quadrant_model.pkl'
+try:
+    import lz4  # noqa: F401 - lz4 decompresses ~10x faster than zlib on cold start
+    MODEL_COMPRESS = ('lz4', 3)
+except ImportError:
+    MODEL_COMPRESS = 3
 training_data_file = 'training_data.json'
+seed_data_file = 'training_seed.json'
 
 def load_training_data() -> List[Dict]:
     """Load training data from JSON file"""
     if os.path.exists(training_data_file):
+        if orjson is not None:
+            return orjson.loads(Path(training_data_file).read_bytes())
         with open(training_data_file, 'r', encoding='utf-8') as f:
             return json.load(f)
-    return get_default_training_data()
+    return _load_seed()
+
+def _read_seed() -> Dict[str, list]:
+    """Raw columnar seed corpus: {'texts': [...], 'labels': [...]}"""
+    if orjson is not None:
+        return orjson.loads(Path(seed_data_file).read_bytes())
+    with open(seed_data_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _load_seed() -> List[Dict]:
+    """Load the bundled seed corpus (columnar texts/labels) as list of dicts"""
+    seed = _read_seed()
+    return [{"text": text, "quadrant": label} for text, label in zip(seed['texts'], seed['labels'])]
+
+@dataclass
+class Corpus:
+    """Training corpus as parallel arrays - what the training paths actually consume"""
+    texts: List[str]
+    labels: np.ndarray  # int8 quadrant per text
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+def load_corpus() -> Corpus:
+    """Load texts and labels only (the seed is columnar on disk - no per-example dicts)
+
+    Repeated texts (case/whitespace-insensitive) collapse onto their first position
+    with the newest label, so a /learn-feedback correction relabels the task
+    instead of being dropped or counted twice.
+    """
+    if os.path.exists(training_data_file):
+        data = load_training_data()
+        pairs = [(item['text'], item['quadrant']) for item in data]
+    else:
+        seed = _read_seed()
+        pairs = list(zip(seed['texts'], seed['labels']))
+
+    latest = {}  # normalized text -> (first spelling, last label); dicts keep first-insertion order
+    for text, label in pairs:
+        key = text.strip().lower()
+        latest[key] = (latest[key][0] if key in latest else text, label)
+    unique = list(latest.values())
+    if len(unique) < len(pairs):
+        print(f"🔄 Pominięto {len(pairs) - len(unique)} zduplikowanych przykładów")
+
+    return Corpus(
+        texts=[text for text, _ in unique],
+        labels=np.fromiter((label for _, label in unique), dtype=np.int8, count=len(unique))
+    )
 
 def save_training_data(data: List[Dict]):
     """Save training data to JSON file"""
+    if orjson is not None:
+        # orjson always writes raw UTF-8 (like ensure_ascii=False), same layout as indent=2
+        Path(training_data_file).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        return
     with open(training_data_file, 'w', encoding='utf-8') as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
 
-def get_default_training_data() -> List[Dict]:
-    """Return the default training data as list of dicts"""
-    return [
-        # English Do Now (urgent + important) - 50 examples
-        {"text": "urgent deadline tomorrow", "quadrant": 0}, {"text": "critical issue fix now", "quadrant": 0}, {"text": "emergency meeting", "quadrant": 0}, {"text": "fire safety check today", "quadrant": 0}, {"text": "critical bug fix immediately", "quadrant": 0},
-        {"text": "meeting with boss now", "quadrant": 0}, {"text": "urgent client call", "quadrant": 0}, {"text": "crisis management plan", "quadrant": 0}, {"text": "fix server crash urgent", "quadrant": 0}, {"text": "emergency response team", "quadrant": 0},
-        {"text": "urgent product launch", "quadrant": 0}, {"text": "deadline presentation", "quadrant": 0}, {"text": "critical system update", "quadrant": 0}, {"text": "emergency audit report", "quadrant": 0}, {"text": "urgent compliance check", "quadrant": 0},
-        {"text": "fire drill today", "quadrant": 0}, {"text": "crisis intervention", "quadrant": 0}, {"text": "urgent strategic review", "quadrant": 0}, {"text": "emergency funding request", "quadrant": 0}, {"text": "deadline extension needed", "quadrant": 0},
-        {"text": "urgent legal advice", "quadrant": 0}, {"text": "critical safety issue", "quadrant": 0}, {"text": "immediate action required", "quadrant": 0}, {"text": "urgent contract review", "quadrant": 0}, {"text": "crisis communication", "quadrant": 0},
-        {"text": "deadline reset", "quadrant": 0}, {"text": "urgent budget approval", "quadrant": 0}, {"text": "critical path analysis", "quadrant": 0}, {"text": "emergency evacuation", "quadrant": 0}, {"text": "urgent stakeholder meeting", "quadrant": 0},
-        {"text": "crisis recovery plan", "quadrant": 0}, {"text": "urgent technology upgrade", "quadrant": 0}, {"text": "deadline extension issue", "quadrant": 0}, {"text": "critical infrastructure fail", "quadrant": 0}, {"text": "emergency board meeting", "quadrant": 0},
-        {"text": "urgent supplier issue", "quadrant": 0}, {"text": "critical quality control", "quadrant": 0}, {"text": "immediate deadline action", "quadrant": 0}, {"text": "crisis mode activated", "quadrant": 0}, {"text": "urgent deadline reminder", "quadrant": 0},
-        {"text": "fire alarm system check", "quadrant": 0}, {"text": "crucial meeting now", "quadrant": 0}, {"text": "emergency protocol", "quadrant": 0}, {"text": "urgent risk assessment", "quadrant": 0}, {"text": "critical deadline approach", "quadrant": 0},
-        {"text": "emergency response drill", "quadrant": 0}, {"text": "urgent compliance issue", "quadrant": 0}, {"text": "crisis management call", "quadrant": 0}, {"text": "deadline extension granted", "quadrant": 0}, {"text": "urgent partner summit", "quadrant": 0},
-
-        # English Schedule (urgent, not important) - 50 examples
-        {"text": "schedule call later", "quadrant": 1}, {"text": "check emails tomorrow", "quadrant": 1}, {"text": "confirm meeting slots", "quadrant": 1}, {"text": "update calendar events", "quadrant": 1}, {"text": "reply to emails today", "quadrant": 1},
-        {"text": "schedule follow-up", "quadrant": 1}, {"text": "book conference room", "quadrant": 1}, {"text": "remind about deadline", "quadrant": 1}, {"text": "update task status", "quadrant": 1}, {"text": "coordinate with team", "quadrant": 1},
-        {"text": "schedule routine check", "quadrant": 1}, {"text": "plan weekly review", "quadrant": 1}, {"text": "set up reminders", "quadrant": 1}, {"text": "confirm attendance", "quadrant": 1}, {"text": "organize agenda", "quadrant": 1},
-        {"text": "schedule daily standup", "quadrant": 1}, {"text": "update contact list", "quadrant": 1}, {"text": "send progress report", "quadrant": 1}, {"text": "finalize minutes", "quadrant": 1}, {"text": "book travel plans", "quadrant": 1},
-        {"text": "coordinate meeting", "quadrant": 1}, {"text": "follow up on actions", "quadrant": 1}, {"text": "send weekly update", "quadrant": 1}, {"text": "plan team lunch", "quadrant": 1}, {"text": "update shared calendar", "quadrant": 1},
-        {"text": "schedule webinar", "quadrant": 1}, {"text": "send meeting invite", "quadrant": 1}, {"text": "confirm project status", "quadrant": 1}, {"text": "update task board", "quadrant": 1}, {"text": "organize documents", "quadrant": 1},
-        {"text": "schedule review meeting", "quadrant": 1}, {"text": "coordinate schedules", "quadrant": 1}, {"text": "send reminder email", "quadrant": 1}, {"text": "finalize agenda items", "quadrant": 1}, {"text": "book conference", "quadrant": 1},
-        {"text": "update meeting notes", "quadrant": 1}, {"text": "plan quarterly review", "quadrant": 1}, {"text": "schedule training session", "quadrant": 1}, {"text": "send newsletter", "quadrant": 1}, {"text": "organize workshop", "quadrant": 1},
-        {"text": "confirm vendor meeting", "quadrant": 1}, {"text": "update event calendar", "quadrant": 1}, {"text": "schedule maintenance", "quadrant": 1}, {"text": "plan team building", "quadrant": 1}, {"text": "send status update", "quadrant": 1},
-        {"text": "coordinate with partners", "quadrant": 1}, {"text": "schedule bi-weekly check", "quadrant": 1}, {"text": "update documentation", "quadrant": 1}, {"text": "finalize proposal", "quadrant": 1}, {"text": "confirm interview slots", "quadrant": 1},
-    ] + get_polish_training_data()
-
-def get_polish_training_data() -> List[Dict]:
-    """Return Polish training data as dicts"""
-    return [
-        # Polish Do Now (urgent + important) - 50 examples
-        {"text": "pilny termin jutro", "quadrant": 0}, {"text": "krytyczny błąd do naprawienia zaraz", "quadrant": 0}, {"text": "pilne spotkanie z szefem", "quadrant": 0}, {"text": "awaryjne poprawki systemu", "quadrant": 0}, {"text": "kryzyse komunikacyjna", "quadrant": 0},
-        {"text": "pilny raport finansowy", "quadrant": 0}, {"text": "natychmiastowa interwencja", "quadrant": 0}, {"text": "kryzyse zarządcza", "quadrant": 0}, {"text": "pilne spotkanie kryzysowe", "quadrant": 0}, {"text": "awaryjna ewakuacja", "quadrant": 0},
-        {"text": "pilna decyzja zarządu", "quadrant": 0}, {"text": "krytyczne bezpieczeństwowa", "quadrant": 0}, {"text": "natychmiastowa naprawa sprzętu", "quadrant": 0}, {"text": "pilny termin umowy", "quadrant": 0}, {"text": "kryzyse finansowy", "quadrant": 0},
-        {"text": "pilna akcja ratownicza", "quadrant": 0}, {"text": "awaryjne zamykania produktów", "quadrant": 0}, {"text": "krytyczna ocena ryzyka", "quadrant": 0}, {"text": "pilna konsultacja prawna", "quadrant": 0}, {"text": "natychmiastowa reakcja", "quadrant": 0},
-        {"text": "kryzyse operacyjny", "quadrant": 0}, {"text": "pilny audyt bezpieczeństwo", "quadrant": 0}, {"text": "awaryjna aktualizacja systemu", "quadrant": 0}, {"text": "krytyczna zmiana strategia", "quadrant": 0}, {"text": "pilne spotkanie rada", "quadrant": 0},
-        {"text": "natychmiastowa decyzja biznesowa", "quadrant": 0}, {"text": "krytyczna awaria sieci", "quadrant": 0}, {"text": "pilny termin wysyłki", "quadrant": 0}, {"text": "awaryjne spotkanie zespół", "quadrant": 0}, {"text": "kryzyse produkcyjna", "quadrant": 0},
-        {"text": "pilna reklama kryzysowa", "quadrant": 0}, {"text": "natychmiastowa transakcja", "quadrant": 0}, {"text": "krytyczna zmiana harmonogramu", "quadrant": 0}, {"text": "awaryjne świadczenia usług", "quadrant": 0}, {"text": "pilny terminarz projektu", "quadrant": 0},
-        {"text": "kryzyse zdrowotna", "quadrant": 0}, {"text": "pilna interwencja medyczna", "quadrant": 0}, {"text": "awaryjna opieka doraźna", "quadrant": 0}, {"text": "krytyczna aktualizacja leków", "quadrant": 0}, {"text": "natychmiastowa pomoc", "quadrant": 0},
-        {"text": "kryzyse środowiskowa", "quadrant": 0}, {"text": "pilna walne zgromadzenie", "quadrant": 0}, {"text": "awaryjne spotkanie akcjonariusze", "quadrant": 0}, {"text": "krytyczna aktualizacja polityka", "quadrant": 0}, {"text": "pilne negocjacje", "quadrant": 0},
-        {"text": "natychmiastowa zmiana szef", "quadrant": 0}, {"text": "kryzyse wizerunkowy", "quadrant": 0}, {"text": "pilna kampania kryzysowa", "quadrant": 0}, {"text": "awaryjne zarządzenie", "quadrant": 0}, {"text": "krytyczna rewiza instytucji", "quadrant": 0},
-
-        # Polish Schedule (urgent, not important) - 50 examples
-        {"text": "zaplanuj spotkanie jutro", "quadrant": 1}, {"text": "zobacz maile później", "quadrant": 1}, {"text": "potwierdź terminy spotkania", "quadrant": 1}, {"text": "zaktualizuj kalender", "quadrant": 1}, {"text": "odpowiedz na emaile dziś", "quadrant": 1},
-    ] + get_remaining_training_data()
-
-def get_remaining_training_data() -> List[Dict]:
-    """Get complete remaining training data"""
-    return [
-        # Polish Schedule continue
-        {"text": "zaplanuj następnych kroków", "quadrant": 1}, {"text": "zarezerwuj sal konferencyjna", "quadrant": 1}, {"text": "przypomnij o terminie", "quadrant": 1}, {"text": "aktualizuj status zadania", "quadrant": 1}, {"text": "skoordynuuj z zespołem", "quadrant": 1},
-        {"text": "zaplanuj rutynowa kontrola", "quadrant": 1}, {"text": "priorytet przegląd tygodniowy", "quadrant": 1}, {"text": "ustaw przypomnienie", "quadrant": 1}, {"text": "potwierdź uczestnictwo", "quadrant": 1}, {"text": "zorganizuj kolejność dnia", "quadrant": 1},
-        {"text": "planuj codzienny scrum", "quadrant": 1}, {"text": "aktualizuj listy kontaktów", "quadrant": 1}, {"text": "wyślij raport postępów", "quadrant": 1}, {"text": "sfinalizuj protokoły", "quadrant": 1}, {"text": "zarezerwuj bilety", "quadrant": 1},
-        {"text": "skoordynuuj terminy", "quadrant": 1}, {"text": "następne działania", "quadrant": 1}, {"text": "wyślij aktualizacja tygodniowa", "quadrant": 1}, {"text": "planuj lunch zespół", "quadrant": 1}, {"text": "aktualizuj kalender wspólny", "quadrant": 1},
-        {"text": "planuj webinar", "quadrant": 1}, {"text": "wyślij zaproszenie spotkanie", "quadrant": 1}, {"text": "potwierdź status projektu", "quadrant": 1}, {"text": "aktualizuj tablice zadania", "quadrant": 1}, {"text": "zorganizuj dokumenty", "quadrant": 1},
-        {"text": "planuj spotkanie przegląd", "quadrant": 1}, {"text": "skoordynuuj harmonogramy", "quadrant": 1}, {"text": "wyślij email przypomnienie", "quadrant": 1}, {"text": "sfinalizuj elementy agenda", "quadrant": 1}, {"text": "zarezerwuj konferencja", "quadrant": 1},
-        {"text": "aktualizuj notas cyfrowa", "quadrant": 1}, {"text": "planuj kwartalna recenzja", "quadrant": 1}, {"text": "planuj sesja treningowa", "quadrant": 1}, {"text": "wyślij newsletter", "quadrant": 1}, {"text": "organizuj warsztat", "quadrant": 1},
-        {"text": "potwierdź spotkanie dostawca", "quadrant": 1}, {"text": "aktualizuj kalender wydarzeń", "quadrant": 1}, {"text": "planuj konserwacja", "quadrant": 1}, {"text": "planuj budowlanie zespół", "quadrant": 1}, {"text": "wyślij aktualizacja status", "quadrant": 1},
-        {"text": "skoordynuuj z partnerami", "quadrant": 1}, {"text": "planuj dwu-tygodniowa kontrola", "quadrant": 1}, {"text": "aktualizuj dokumentacja", "quadrant": 1}, {"text": "sfinalizuj propozycja", "quadrant": 1}, {"text": "potwierdź slota wywiad", "quadrant": 1},
-
-        # English Delegate (important, not urgent) - 50 examples
-        {"text": "prepare report", "quadrant": 2}, {"text": "strategize project", "quadrant": 2}, {"text": "design new feature", "quadrant": 2}, {"text": "develop software module", "quadrant": 2}, {"text": "research market trends", "quadrant": 2},
-        {"text": "plan long-term goals", "quadrant": 2}, {"text": "build customer retention", "quadrant": 2}, {"text": "optimize workflow process", "quadrant": 2}, {"text": "train new employees", "quadrant": 2}, {"text": "enhance security", "quadrant": 2},
-        {"text": "develop training program", "quadrant": 2}, {"text": "research competitors", "quadrant": 2}, {"text": "plan infrastructure upgrade", "quadrant": 2}, {"text": "build team skills", "quadrant": 2}, {"text": "optimize sales pipeline", "quadrant": 2},
-        {"text": "create marketing strategy", "quadrant": 2}, {"text": "design user experience", "quadrant": 2}, {"text": "build data analytics", "quadrant": 2}, {"text": "research future trends", "quadrant": 2}, {"text": "develop innovation ideas", "quadrant": 2},
-        {"text": "plan sustainability", "quadrant": 2}, {"text": "enhance customer experience", "quadrant": 2}, {"text": "build strategic partnerships", "quadrant": 2}, {"text": "develop quality assurance", "quadrant": 2}, {"text": "optimize supply chain", "quadrant": 2},
-        {"text": "create content strategy", "quadrant": 2}, {"text": "design dashboard system", "quadrant": 2}, {"text": "research new markets", "quadrant": 2}, {"text": "build service delivery", "quadrant": 2}, {"text": "develop leadership skills", "quadrant": 2},
-        {"text": "plan organizational change", "quadrant": 2}, {"text": "enhance operational efficiency", "quadrant": 2}, {"text": "build brand awareness", "quadrant": 2}, {"text": "develop risk management", "quadrant": 2}, {"text": "optimize cost structure", "quadrant": 2},
-        {"text": "create implementation plan", "quadrant": 2}, {"text": "design performance metrics", "quadrant": 2}, {"text": "research industry standards", "quadrant": 2}, {"text": "build stakeholder engagement", "quadrant": 2}, {"text": "develop business model", "quadrant": 2},
-        {"text": "plan digital transformation", "quadrant": 2}, {"text": "enhance regulatory compliance", "quadrant": 2}, {"text": "build supplier relationships", "quadrant": 2}, {"text": "develop corporate culture", "quadrant": 2}, {"text": "optimize resource allocation", "quadrant": 2},
-
-        # English Delete (not important, not urgent) - 50 examples
-        {"text": "delete old files", "quadrant": 3}, {"text": "clean up cache", "quadrant": 3}, {"text": "remove unused code", "quadrant": 3}, {"text": "archive old emails", "quadrant": 3}, {"text": "delete duplicate entries", "quadrant": 3},
-        {"text": "clean desktop shortcuts", "quadrant": 3}, {"text": "remove expired links", "quadrant": 3}, {"text": "archive old projects", "quadrant": 3}, {"text": "delete temporary files", "quadrant": 3}, {"text": "clean browser cookies", "quadrant": 3},
-        {"text": "remove spam contacts", "quadrant": 3}, {"text": "archive old reports", "quadrant": 3}, {"text": "delete test data", "quadrant": 3}, {"text": "clean download folder", "quadrant": 3}, {"text": "remove old backups", "quadrant": 3},
-        {"text": "archive unused documentation", "quadrant": 3}, {"text": "delete placeholder content", "quadrant": 3}, {"text": "clean contact lists", "quadrant": 3}, {"text": "remove draft emails", "quadrant": 3}, {"text": "delete obsolete policies", "quadrant": 3},
-        {"text": "archive completed tasks", "quadrant": 3}, {"text": "remove expired discounts", "quadrant": 3}, {"text": "delete old notifications", "quadrant": 3}, {"text": "clean recycle bin", "quadrant": 3}, {"text": "archive old logs", "quadrant": 3},
-        {"text": "remove bookmarks", "quadrant": 3}, {"text": "delete duplicate photos", "quadrant": 3}, {"text": "clean outbox", "quadrant": 3}, {"text": "archive old tickets", "quadrant": 3}, {"text": "delete test accounts", "quadrant": 3},
-        {"text": "remove unused scripts", "quadrant": 3}, {"text": "clean temporary folders", "quadrant": 3}, {"text": "archive old contacts", "quadrant": 3}, {"text": "delete draft proposals", "quadrant": 3}, {"text": "remove unused filters", "quadrant": 3},
-        {"text": "archive old presentations", "quadrant": 3}, {"text": "delete sample data", "quadrant": 3}, {"text": "clean browser history", "quadrant": 3}, {"text": "remove expired credentials", "quadrant": 3}, {"text": "delete old templates", "quadrant": 3},
-
-        # Polish Delegate (important, not urgent) - 50 examples
-        {"text": "przygotuj raport", "quadrant": 2}, {"text": "rozważ strategie projektu", "quadrant": 2}, {"text": "zaprojektuj nowa funkcja", "quadrant": 2}, {"text": "rozwoju moduł oprogramowania", "quadrant": 2}, {"text": "badaj trendy rynku", "quadrant": 2},
-        {"text": "planuj dlugoterminarz cele", "quadrant": 2}, {"text": "buduj retencja klientów", "quadrant": 2}, {"text": "optymalizuj proces przeplywu", "quadrant": 2}, {"text": "szkol nowych pracowników", "quadrant": 2}, {"text": "ulepsz bezpieczność", "quadrant": 2},
-        {"text": "rozwoju program szkolenia", "quadrant": 2}, {"text": "badaj konkurentów", "quadrant": 2}, {"text": "planuj upgrade infrastruktury", "quadrant": 2}, {"text": "buduj umiejętności zespół", "quadrant": 2}, {"text": "optymalizuj lejek sprzedażowy", "quadrant": 2},
-        {"text": "stwórz strategię marketingową", "quadrant": 2}, {"text": "zaprojektuj doświadczenie użytkownik", "quadrant": 2}, {"text": "buduj analityka danych", "quadrant": 2}, {"text": "badaj przyszłe trendy", "quadrant": 2}, {"text": "rozwoju pomysły innowacyjne", "quadrant": 2},
-        {"text": "planuj trwałość", "quadrant": 2}, {"text": "rozszerz doświadczenie klient", "quadrant": 2}, {"text": "buduj strategiczne partnerstwa", "quadrant": 2}, {"text": "rozwoju zapewnienie jakość", "quadrant": 2}, {"text": "optymalizuj ciąg dostaw", "quadrant": 2},
-        {"text": "stwórz strategię treści", "quadrant": 2}, {"text": "zaprojektuj system dashboard", "quadrant": 2}, {"text": "badaj nowe rynki", "quadrant": 2}, {"text": "buduj dostarczanie usług", "quadrant": 2}, {"text": "rozwoju umiejętności przywództwa", "quadrant": 2},
-        {"text": "planuj zmiana organizacyjna", "quadrant": 2}, {"text": "ulepsz efektywność operacyjna", "quadrant": 2}, {"text": "buduj świadomość marka", "quadrant": 2}, {"text": "rozwoju zarządzanie ryzykiem", "quadrant": 2}, {"text": "optymalizuj strukture kosztów", "quadrant": 2},
-        {"text": "stwórz plan implementacji", "quadrant": 2}, {"text": "zaprojektuj metryki wydajności", "quadrant": 2}, {"text": "badaj standardy branży", "quadrant": 2}, {"text": "buduj zaangażowanie stakeholder", "quadrant": 2}, {"text": "rozwoju model biznesowy", "quadrant": 2},
-        {"text": "planuj transformacja cyfrowa", "quadrant": 2}, {"text": "ulepsz zgodność regulacyjna", "quadrant": 2}, {"text": "buduj relacje dostawca", "quadrant": 2}, {"text": "rozwoju kultura firma", "quadrant": 2}, {"text": "optymalizuj alokacja zasobów", "quadrant": 2},
-
-        # Polish Delete (not important, not urgent) - 50 examples
-        {"text": "usuń stare pliki", "quadrant": 3}, {"text": "wyczyść pamięć podręczną", "quadrant": 3}, {"text": "usuwanie nieużywany kod", "quadrant": 3}, {"text": "archiwizuj stare emaile", "quadrant": 3}, {"text": "usuwanie powtórzót wpisy", "quadrant": 3},
-        {"text": "czyść skróty pulpit", "quadrant": 3}, {"text": "usuwanie wygasł link", "quadrant": 3}, {"text": "archiwizuj stare projektu", "quadrant": 3}, {"text": "usuwanie pliki tymczasowe", "quadrant": 3}, {"text": "czyść ciasteczka przeglądarka", "quadrant": 3},
-        {"text": "usuwanie spam kontakty", "quadrant": 3}, {"text": "archiwizuj stare rapor", "quadrant": 3}, {"text": "usuwanie dane testowe", "quadrant": 3}, {"text": "czyść folder pobierania", "quadrant": 3}, {"text": "usuwanie stare kopie zapasowe", "quadrant": 3},
-        {"text": "archiwizuj nieużywane dokumentacja", "quadrant": 3}, {"text": "usuwanie miejsceasem zawartości", "quadrant": 3}, {"text": "czyść listy kontaktów", "quadrant": 3}, {"text": "usuwanie draft emaile", "quadrant": 3}, {"text": "usuwanie przestarzałe polityki", "quadrant": 3},
-        {"text": "archiwizuj ukończone zadania", "quadrant": 3}, {"text": "usuwanie wygasł rabaty", "quadrant": 3}, {"text": "usuwanie stare powiadomienia", "quadrant": 3}, {"text": "czyść kosz", "quadrant": 3}, {"text": "archiwizuj stare dzienniki", "quadrant": 3},
-        {"text": "usuwanie zakładki", "quadrant": 3}, {"text": "usuwanie duplicate zdjęcia", "quadrant": 3}, {"text": "czyść wychodzące", "quadrant": 3}, {"text": "archiwizuj stare bilety", "quadrant": 3}, {"text": "usuwanie kont testowe", "quadrant": 3},
-        {"text": "usuwanie nieużywane skrypty", "quadrant": 3}, {"text": "czyść tymczasowe foldery", "quadrant": 3}, {"text": "archiwizuj stare kontakty", "quadrant": 3}, {"text": "usuwanie draft propozycja", "quadrant": 3}, {"text": "usuwanie nieużywane filtry", "quadrant": 3},
-        {"text": "archiwizuj stare prezentacje", "quadrant": 3}, {"text": "usuwanie dane próbne", "quadrant": 3}, {"text": "czyść historia przeglądarka", "quadrant": 3}, {"text": "usuwanie wygaśnięte poświadczenia", "quadrant": 3}, {"text": "usuwanie stare szablony", "quadrant": 3},
-    ]
+def _corpus_sha() -> str:
+    """SHA-256 of the corpus file the model is trained from"""
+    path = training_data_file if os.path.exists(training_data_file) else seed_data_file
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
 
 def create_pipeline():
     """Create ML pipeline"""
+    # sklearn is imported lazily so `import main` stays cheap until a model is needed
+    from sklearn.feature_extraction.text import HashingVectorizer
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.pipeline import Pipeline
+
+    # Stateless hashing (no vocabulary lookups) + linear model that supports partial_fit
     return Pipeline([
-        ('tfidf', TfidfVectorizer(max_features=500, stop_words='english', ngram_range=(1,2))),
-        ('clf', LogisticRegression(random_state=42, max_iter=1000, warm_start=True))  # warm_start for incremental learning
+        ('hv', HashingVectorizer(n_features=2**14, ngram_range=(1,2), alternate_sign=False, norm='l2', dtype=np.float32)),
+        ('clf', SGDClassifier(loss='log_loss', max_iter=200, random_state=42))
     ])
 
-def train_model(should_save: bool = True):
-    """Train model with current training data"""
-    training_data = load_training_data()
-    texts = [item['text'] for item in training_data]
-    labels = [item['quadrant'] for item in training_data]
+def train_model(should_save: bool = True, base_model=None):
+    """Train model with current training data
+
+    With base_model, only examples appended since it was trained are ingested
+    via partial_fit and base_model itself is returned (untouched if the corpus
+    hash has not changed); otherwise - including when feedback relabeled an
+    example it was already trained on - a new pipeline is fitted on the whole corpus.
+    """
+    corpus_sha = _corpus_sha()
+    if base_model is not None and getattr(base_model, 'corpus_sha_', None) == corpus_sha:
+        print("✅ Dane treningowe bez zmian, pomijam trening")
+        return base_model
+
+    corpus = load_corpus()
+    class_counts = np.bincount(corpus.labels, minlength=len(QUADRANT_NAMES))
+    print(f"📊 Przykłady na kwadrant: {dict(enumerate(class_counts.tolist()))}")
+    seen = getattr(base_model, 'n_training_examples_', None)
+    trained_labels = getattr(base_model, 'training_labels_', None)
+
+    # partial_fit only applies when the corpus merely grew - a relabeled earlier row needs a full refit
+    if (seen is not None and 0 < seen <= len(corpus) and trained_labels is not None
+            and np.array_equal(corpus.labels[:seen], trained_labels)):
+        model = base_model
+        new_texts = corpus.texts[seen:]
+        if new_texts:
+            # Hashing features are stateless - transform only the delta
+            X_new = model[:-1].transform(new_texts)
+            model.named_steps['clf'].partial_fit(X_new, corpus.labels[seen:], classes=list(QUADRANT_NAMES))
+        print(f"🔄 Model douczony inkrementalnie: {len(new_texts)} nowych przykładów")
+    else:
+        model = create_pipeline()
+        model.fit(corpus.texts, corpus.labels)
 
-    model = create_pipeline()
-    model.fit(texts, labels)
+    model.n_training_examples_ = len(corpus)
+    model.training_labels_ = corpus.labels.copy()
+    model.corpus_sha_ = corpus_sha
 
     if should_save:
-        joblib.dump(model, model_path)
-        print(f"✅ Model wytrenowany! {len(training_data)} przykładów treningowych")
+        import joblib
+        joblib.dump({'model': model, 'corpus_sha': corpus_sha}, model_path, compress=MODEL_COMPRESS)
+        print(f"✅ Model wytrenowany! {len(corpus)} przykładów treningowych")
+
+        # Keep the HNSW index in step with the corpus the model was trained on
+        try:
+            update_vector_db_with_new_data()
+        except Exception as e:
+            print(f"⚠️ Unable to update vector database: {e}")
+
+        # The BERT head is refitted on the same corpus (cheap: embeddings come from the cache)
+        if _get_sentence_model() is not None:
+            try:
+                _train_embedding_head(corpus, corpus_sha)
+            except Exception as e:
+                print(f"⚠️ Unable to train BERT head: {e}")
 
     return model
 
 # Global model variable
 model = None
 
+_model_lock = threading.Lock()
+
 def get_model():
-    """Lazy loading of model"""
+    """Lazy loading of model (one loader at a time; others see it only once fully ready)"""
     global model
     if model is None:
-        if os.path.exists(model_path):
-            model = joblib.load(model_path)
-            training_count = len(load_training_data())
-            print(f"✅ Model załadowany z pliku! {training_count} przykładów treningowych")
-        else:
-            print("🔄 Trenowanie nowego modelu...")
-            model = train_model()
+        with _model_lock:
+            if model is None:
+                model = _load_model()
     return model
 
-# Load model at startup
-get_model()
+def _load_model():
+    """Load the pickled model, retraining when it is outdated or missing"""
+    if not os.path.exists(model_path):
+        print("🔄 Trenowanie nowego modelu...")
+        return train_model()
+
+    import joblib
+    saved = joblib.load(model_path)
+    if isinstance(saved, dict):
+        loaded = saved['model']
+        loaded.corpus_sha_ = saved['corpus_sha']
+    else:
+        loaded = saved  # Older pickle without corpus hash
+    if 'hv' not in loaded.named_steps:
+        # Pickle from the old TF-IDF pipeline - retrain with the current one
+        print("🔄 Nieaktualny format modelu, trenowanie od nowa...")
+        return train_model()
+    if getattr(loaded, 'corpus_sha_', None) != _corpus_sha():
+        print("🔄 Dane treningowe zmienione, aktualizacja modelu...")
+        return train_model(base_model=loaded)
+    training_count = len(load_training_data())
+    print(f"✅ Model załadowany z pliku! {training_count} przykładów treningowych")
+    return loaded
+
+# Linear head of the current model: (model, feature pipeline, W, b, classes)
+_linear_head = None
+
+def _get_linear_head():
+    """Extract features + coefficients once per model instance"""
+    global _linear_head
+    current = get_model()
+    if _linear_head is None or _linear_head[0] is not current:
+        clf = current.named_steps['clf']
+        _linear_head = (
+            current,
+            current[:-1],
+            clf.coef_.astype(np.float32),
+            clf.intercept_.astype(np.float32),
+            clf.classes_
+        )
+    return _linear_head
+
+HEAD_PATH = 'head.pt'
+HEAD_EPOCHS = 100
+
+# nn.Linear head on BERT embeddings as NumPy (W float32 (4, d), b float32 (4,)); replaces the
+# hashing pipeline for predictions whenever the sentence model is available
+_embedding_head = None
+_embedding_head_lock = threading.RLock()  # Taken after get_model()'s lock, never before it
+
+def _train_embedding_head(corpus: Corpus, corpus_sha: str):
+    """Train nn.Linear(d, 4) on cached BERT embeddings and save its state_dict to HEAD_PATH"""
+    global _embedding_head
+    with _embedding_head_lock:
+        torch = _configure_torch()
+
+        X = torch.from_numpy(encode_cached(corpus.texts))
+        y = torch.from_numpy(corpus.labels.astype(np.int64))
+
+        head = torch.nn.Linear(X.shape[1], len(QUADRANT_NAMES))
+        optimizer = torch.optim.Adam(head.parameters(), lr=0.05)
+        loss_fn = torch.nn.CrossEntropyLoss()
+        for _ in range(HEAD_EPOCHS):  # Full batch - the corpus fits in one matrix
+            optimizer.zero_grad()
+            loss = loss_fn(head(X), y)
+            loss.backward()
+            optimizer.step()
+
+        torch.save({'state_dict': head.state_dict(), 'corpus_sha': corpus_sha}, HEAD_PATH)
+        _embedding_head = (head.weight.detach().numpy().copy(), head.bias.detach().numpy().copy())
+        print(f"✅ Głowica BERT wytrenowana! loss={loss.item():.3f}")
+
+def _get_embedding_head() -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Embedding head matching the current corpus, or None when BERT is unavailable"""
+    global _embedding_head
+    if _embedding_head is None and _get_sentence_model() is not None:
+        # Resolve the model before taking the head lock - training under get_model() takes it too
+        corpus_sha = getattr(get_model(), 'corpus_sha_', None) or _corpus_sha()
+        with _embedding_head_lock:
+            if _embedding_head is None and os.path.exists(HEAD_PATH):
+                saved = _configure_torch().load(HEAD_PATH)
+                if saved['corpus_sha'] == corpus_sha:
+                    state = saved['state_dict']
+                    _embedding_head = (state['weight'].numpy(), state['bias'].numpy())
+            if _embedding_head is None:
+                _train_embedding_head(load_corpus(), corpus_sha)
+    return _embedding_head
+
+def predict_one(text: str, query_embedding: Optional[np.ndarray] = None) -> int:
+    """Predykcja pojedynczego tekstu: jeden iloczyn macierz-wektor (głowica BERT lub pipeline)"""
+    head = _get_embedding_head()
+    if head is not None:
+        if query_embedding is None:
+            query_embedding = encode_cached([text])[0]
+        weights, bias = head
+        return int(np.argmax(weights @ query_embedding + bias))
+
+    _, features, weights, bias, classes = _get_linear_head()
+    scores = features.transform([text]) @ weights.T + bias
+
+    if scores.shape[1] == 1:  # Binary model: single decision function
+        return int(classes[int(scores[0, 0] > 0)])
+    return int(classes[np.argmax(scores)])
 
-# Initialize vector database with current data (Phase 2)
-try:
-    update_vector_db_with_new_data()
-except Exception as e:
-    print(f"⚠️ Unable to initialize vector database: {e}")
 
 # Map predictions to boolean
 def map_to_bool(prediction):
@@ -382,40 +785,169 @@ QUADRANT_NAMES = {
     3: "Usuń (Nie ważne, nie pilne)"
 }
 
-def find_similar_examples(query: str, top_k: int = 5) -> List[Dict]:
-    """Znajdź podobne przykłady z bazy treningowej używając BERT embeddings (PHASE 1)"""
-    if sentence_model is None:
+SEED_EMB_PATH = "seed_emb.{backend}.{sha}.npy"  # One file per sentence-model backend and seed content
+_seed_emb = None  # (seed texts, memory-mapped float16 embedding matrix)
+
+def _seed_emb_path(texts: List[str]) -> str:
+    """SEED_EMB_PATH for these seed texts - any edit or reorder of the seed gets a new file"""
+    sha = hashlib.sha256("\0".join(texts).encode()).hexdigest()[:16]
+    return SEED_EMB_PATH.format(backend=_embedding_backend(), sha=sha)
+
+def _precompute_seed_embeddings():
+    """Encode the seed corpus once (L2-normalized, float16) and persist it to SEED_EMB_PATH"""
+    texts = _read_seed()['texts']
+    with _torch_inference():
+        embeddings = _get_sentence_model().encode(
+            texts, batch_size=64, convert_to_numpy=True, normalize_embeddings=True, show_progress_bar=False
+        )
+    # Per-process temp file + atomic rename - a concurrent reader never maps a half-written matrix
+    path = _seed_emb_path(texts)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, embeddings.astype(np.float16))
+    os.replace(tmp_path, path)
+    print(f"✅ Embeddingi seed zapisane: {embeddings.shape[0]}x{embeddings.shape[1]}")
+
+def _get_seed_embeddings() -> Tuple[List[str], np.ndarray]:
+    """Seed texts and their normalized embeddings, memory-mapped from SEED_EMB_PATH"""
+    global _seed_emb
+    if _seed_emb is None:
+        texts = _read_seed()['texts']
+        path = _seed_emb_path(texts)
+        if not os.path.exists(path):
+            _precompute_seed_embeddings()
+        _seed_emb = (texts, np.load(path, mmap_mode='r'))
+    return _seed_emb
+
+_corpus_emb = None  # (corpus file signature, training data, normalized float16 corpus embedding matrix, PCA projection)
+CORPUS_DOT_BLOCK = 4096  # Rows upcast per GEMV block - small enough to stay in L2 cache
+# Optional PCA of the cached corpus matrix (e.g. 128) - 0 keeps the full 384 dims.
+# Projection shifts the similarity distribution, so the 0.3 cut-off may need retuning when enabled.
+CORPUS_PCA_DIM = int(os.getenv("CORPUS_PCA_DIM", 0))
+
+def _dot_f16(matrix: np.ndarray, vector: np.ndarray) -> np.ndarray:
+    """float16 matrix @ float32 vector: half the bytes read from RAM, float32 BLAS on cache-sized blocks"""
+    out = np.empty(matrix.shape[0], dtype=np.float32)
+    for start in range(0, matrix.shape[0], CORPUS_DOT_BLOCK):
+        block = matrix[start:start + CORPUS_DOT_BLOCK]
+        out[start:start + len(block)] = block.astype(np.float32) @ vector
+    return out
+
+def _corpus_signature() -> Tuple:
+    """Cheap change marker for the corpus on disk: path, mtime and size"""
+    path = training_data_file if os.path.exists(training_data_file) else seed_data_file
+    st = os.stat(path)
+    return (path, st.st_mtime_ns, st.st_size)
+
+def _fit_projection(embeddings: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """PCA (mean, components) for CORPUS_PCA_DIM, None when disabled or the corpus is too small to fit it"""
+    if CORPUS_PCA_DIM <= 0 or CORPUS_PCA_DIM >= min(embeddings.shape):
+        return None
+    from sklearn.decomposition import PCA
+    pca = PCA(n_components=CORPUS_PCA_DIM, random_state=42).fit(embeddings)
+    return pca.mean_.astype(np.float32), pca.components_.astype(np.float32)
+
+def _project(embeddings: np.ndarray, projection: Tuple[np.ndarray, np.ndarray]) -> np.ndarray:
+    """Project onto the PCA basis and re-normalize, so cosine stays a plain dot product"""
+    mean, components = projection
+    reduced = (embeddings - mean) @ components.T
+    return reduced / np.maximum(np.linalg.norm(reduced, axis=-1, keepdims=True), 1e-12)
+
+CORPUS_EMB_PATH = "corpus_emb.npy"
+CORPUS_MANIFEST_PATH = "corpus_manifest.json"
+
+def _load_corpus_matrix(all_texts: List[str]) -> np.ndarray:
+    """Full-size float16 corpus matrix, memory-mapped from CORPUS_EMB_PATH when its manifest matches"""
+    manifest = {
+        "count": len(all_texts),
+        "sha": hashlib.sha256("\0".join(all_texts).encode()).hexdigest(),
+        "model": SENTENCE_MODEL_NAME,
+        # Vectors from another backend/precision are not interchangeable - mismatch means rebuild
+        "backend": _embedding_backend(),
+        "dtype": "float16"
+    }
+    try:
+        with open(CORPUS_MANIFEST_PATH, 'r', encoding='utf-8') as f:
+            if json.load(f) == manifest:
+                # Read-only mmap: restarts skip encoding and workers share the pages via the OS cache
+                return np.load(CORPUS_EMB_PATH, mmap_mode='r')
+    except (OSError, ValueError):
+        pass
+
+    # Seed prefix comes from the precomputed matrix, examples added on top from the embedding cache
+    seed_texts, seed_embeddings = _get_seed_embeddings()
+    n_seed = len(seed_texts) if all_texts[:len(seed_texts)] == seed_texts else 0
+    parts = [np.asarray(seed_embeddings[:n_seed], dtype=np.float16)]
+    if n_seed < len(all_texts):
+        parts.append(encode_cached(all_texts[n_seed:]).astype(np.float16))
+    embeddings = np.concatenate(parts)
+
+    # Matrix first, manifest last (both via atomic rename) - a matching manifest always means a complete file.
+    # Temp names are per process so workers rebuilding at the same time never write into each other's file
+    emb_tmp, manifest_tmp = f"{CORPUS_EMB_PATH}.{os.getpid()}.tmp", f"{CORPUS_MANIFEST_PATH}.{os.getpid()}.tmp"
+    with open(emb_tmp, 'wb') as f:
+        np.save(f, embeddings)
+    os.replace(emb_tmp, CORPUS_EMB_PATH)
+    with open(manifest_tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(manifest_tmp, CORPUS_MANIFEST_PATH)
+    return embeddings
+
+def _get_corpus_embeddings() -> Tuple[List[Dict], np.ndarray, Optional[Tuple[np.ndarray, np.ndarray]]]:
+    """Training data, its normalized embedding matrix and optional PCA projection, rebuilt when the corpus file changes"""
+    global _corpus_emb
+    signature = _corpus_signature()
+    if _corpus_emb is None or _corpus_emb[0] != signature:
+        training_data = load_training_data()
+        embeddings = _load_corpus_matrix([item['text'] for item in training_data])
+
+        # PCA is cheap to refit - only the full-size matrix is persisted
+        projection = None
+        if CORPUS_PCA_DIM > 0:
+            full = np.asarray(embeddings, dtype=np.float32)
+            projection = _fit_projection(full)
+            if projection is not None:
+                embeddings = np.ascontiguousarray(_project(full, projection), dtype=np.float16)
+
+        # Single tuple assignment - concurrent readers never see data and matrix out of step
+        _corpus_emb = (signature, training_data, embeddings, projection)
+    return _corpus_emb[1:]
+
+def find_similar_examples(query: str, top_k: int = 5, query_embedding: Optional[np.ndarray] = None) -> List[Dict]:
+    """Znajdź podobne przykłady z bazy treningowej używając BERT embeddings (PHASE 1)
+
+    query_embedding may be passed in when the query was already encoded (e.g. batched).
+    """
+    if _get_sentence_model() is None:
         # Fallback to TF-IDF if BERT not available
         print("⚠️ BERT nie załadowany, używam TF-IDF fallback")
         return find_similar_examples_tfidf(query, top_k)
 
-    training_data = load_training_data()
-    if len(training_data) < 1:
-        return []
-
     # Phase 2: Use ChromaDB if available
+    _init_vector_db()
     if chroma_client is not None and collection is not None and collection.count() > 0:
-        return find_similar_examples_chroma(query, top_k)
-
-    # Phase 1: Use BERT embeddings directly
-    all_texts = [item['text'] for item in training_data]
-    query_embedding = sentence_model.encode([query])[0]
+        return find_similar_examples_chroma(query, top_k, query_embedding)
 
-    # Batch encode all training examples (for efficiency)
-    batch_size = 100
-    all_embeddings = []
-    for i in range(0, len(all_texts), batch_size):
-        batch_texts = all_texts[i:i+batch_size]
-        batch_embeddings = sentence_model.encode(batch_texts)
-        all_embeddings.extend(batch_embeddings)
+    return _find_similar_examples_bert(query, top_k, query_embedding)
 
-    all_embeddings = np.array(all_embeddings)
-
-    # Calculate cosine similarities
-    similarities = cosine_similarity([query_embedding], all_embeddings)[0]
+def _find_similar_examples_bert(query: str, top_k: int = 5, query_embedding: Optional[np.ndarray] = None) -> List[Dict]:
+    """Brute-force BERT scan over the cached corpus matrix - used when ChromaDB is unavailable or fails"""
+    # Phase 1: Use BERT embeddings directly - corpus matrix is encoded once per corpus version
+    training_data, corpus_embeddings, projection = _get_corpus_embeddings()
+    if len(training_data) < 1:
+        return []
 
-    # Get top-k most similar examples
-    similar_indices = np.argsort(similarities)[-top_k:][::-1]
+    # Cached embeddings are unit length - cosine is a dot product over the float16 corpus matrix
+    if query_embedding is None:
+        query_embedding = encode_cached([query])[0]
+    if projection is not None:
+        query_embedding = _project(query_embedding, projection)
+    similarities = _dot_f16(corpus_embeddings, np.asarray(query_embedding, dtype=np.float32))
+
+    # Get top-k most similar examples: O(N) selection, then sort only the k winners
+    k = min(top_k, len(similarities))
+    candidates = np.argpartition(-similarities, k - 1)[:k]
+    similar_indices = candidates[np.argsort(-similarities[candidates])]
     similar_examples = []
 
     for idx in similar_indices:
@@ -433,26 +965,59 @@ def find_similar_examples(query: str, top_k: int = 5) -> List[Dict]:
 
     return similar_examples
 
+# Common Polish function words - the corpus is bilingual, sklearn only ships English stopwords
+POLISH_STOP_WORDS = frozenset("""
+a aby ale albo am ani aż bardzo bez bo być był była było byli będzie będą by choć ci cię co czy dla do
+dwa gdy gdzie go i ich ile im innych jak jako jakie jaki jej jest jestem jeszcze jeśli jego już ją
+każdy kiedy kto która które którego której który których ku lub ma mają mi mnie może można mu my na
+nad nam nas nasz nasze nie niech nim nich no o od on ona one oni oraz po pod ponieważ przed przez przy
+sam się są ta tak taki tam te tego tej ten też to tu tutaj tych tylko tym tę w we wiele więc wszystko
+z za ze że żeby
+""".split())
+
+_tfidf_index = None  # (corpus file signature, training data, fitted TfidfVectorizer, CSC corpus matrix)
+
+def _get_tfidf_index():
+    """TF-IDF vectorizer fitted on the corpus, refitted only when the corpus file changes"""
+    global _tfidf_index
+    signature = _corpus_signature()
+    if _tfidf_index is None or _tfidf_index[0] != signature:
+        from sklearn.feature_extraction.text import TfidfVectorizer, ENGLISH_STOP_WORDS
+
+        training_data = load_training_data()
+        vectorizer = TfidfVectorizer(
+            max_features=500,
+            stop_words=list(ENGLISH_STOP_WORDS | POLISH_STOP_WORDS),
+            ngram_range=(1,2),
+            dtype=np.float32,
+            sublinear_tf=True
+        )
+        # Column-major: each term's postings (rows + weights) are one contiguous slice - an inverted index
+        tfidf_matrix = vectorizer.fit_transform([item['text'] for item in training_data]).tocsc() if training_data else None
+        _tfidf_index = (signature, training_data, vectorizer, tfidf_matrix)
+    return _tfidf_index[1:]
+
 def find_similar_examples_tfidf(query: str, top_k: int = 5) -> List[Dict]:
     """Fallback metoda używająca TF-IDF gdy BERT nie jest dostępny"""
-    training_data = load_training_data()
+    training_data, vectorizer, training_vectors = _get_tfidf_index()
     if len(training_data) < 2:
         return []
 
-    texts = [query] + [item['text'] for item in training_data]
-
-    # Create TF-IDF vectorizer and transform
-    vectorizer = TfidfVectorizer(max_features=500, stop_words='english', ngram_range=(1,2))
-    tfidf_matrix = vectorizer.fit_transform(texts)
-
-    # Calculate cosine similarity between query and all training examples
-    query_vector = tfidf_matrix[0]
-    training_vectors = tfidf_matrix[1:]
-
-    similarities = cosine_similarity(query_vector, training_vectors)[0]
-
-    # Get top-k most similar examples
-    similar_indices = np.argsort(similarities)[-top_k:][::-1]
+    # Only the query is vectorized per request - the corpus matrix is reused
+    query_vector = vectorizer.transform([query])
+
+    # TF-IDF rows are already L2-normalized - cosine similarity is a plain sparse dot product.
+    # Walk only the postings of the query's terms; rows sharing no term stay at zero.
+    similarities = np.zeros(training_vectors.shape[0], dtype=np.float32)
+    indptr, rows, weights = training_vectors.indptr, training_vectors.indices, training_vectors.data
+    for term, query_weight in zip(query_vector.indices, query_vector.data):
+        start, end = indptr[term], indptr[term + 1]
+        similarities[rows[start:end]] += query_weight * weights[start:end]
+
+    # Get top-k most similar examples: O(N) selection, then sort only the k winners
+    k = min(top_k, len(similarities))
+    candidates = np.argpartition(-similarities, k - 1)[:k]
+    similar_indices = candidates[np.argsort(-similarities[candidates])]
     similar_examples = []
 
     for idx in similar_indices:
@@ -469,15 +1034,20 @@ def find_similar_examples_tfidf(query: str, top_k: int = 5) -> List[Dict]:
 
     return similar_examples
 
-def find_similar_examples_chroma(query: str, top_k: int = 5) -> List[Dict]:
+def find_similar_examples_chroma(query: str, top_k: int = 5, query_embedding: Optional[np.ndarray] = None) -> List[Dict]:
     """PHASE 2: Znajdź podobne przykłady używając ChromaDB vector database"""
     try:
-        # Query ChromaDB for similar examples
-        results = collection.query(
-            query_texts=[query],
-            n_results=top_k*2,  # Get more, we'll filter later
-            include=['documents', 'metadatas', 'distances']
-        )
+        # Query the HNSW index with the same (cached) embedding model the collection was built with
+        if query_embedding is None:
+            query_embedding = encode_cached([query])[0]
+        query_kwargs = dict(query_embeddings=[query_embedding.tolist()], include=['documents', 'metadatas', 'distances'])
+        try:
+            results = collection.query(n_results=top_k*2, **query_kwargs)  # Get more, we'll filter later
+        except RuntimeError as e:
+            if "contigious" not in str(e):
+                raise
+            # hnswlib could not collect that many neighbours within search_ef - ask for exactly top_k
+            results = collection.query(n_results=top_k, **query_kwargs)
 
         similar_examples = []
         if results and results['documents']:
@@ -485,8 +1055,8 @@ def find_similar_examples_chroma(query: str, top_k: int = 5) -> List[Dict]:
                 metadata = results['metadatas'][0][i]
                 distance = results['distances'][0][i]
 
-                # Convert distance to similarity (Chroma returns distance)
-                similarity = 1 / (1 + distance)
+                # Cosine space: distance = 1 - cosine similarity
+                similarity = 1 - distance
 
                 if similarity > 0.3:  # Filter low similarity
                     similar_examples.append({
@@ -502,60 +1072,143 @@ def find_similar_examples_chroma(query: str, top_k: int = 5) -> List[Dict]:
 
     except Exception as e:
         print(f"⚠️ ChromaDB query failed: {e}")
-        # Fallback to BERT
-        return find_similar_examples(query, top_k)
+        # Fallback to the direct BERT scan (not find_similar_examples - it would route back here)
+        return _find_similar_examples_bert(query, top_k, query_embedding)
+
+def _example_id(text: str) -> str:
+    """Stable Chroma id derived from the example text - independent of its position in the corpus
+
+    Normalized like load_corpus de-duplication; blake2b since nothing here needs a cryptographic hash.
+    """
+    return hashlib.blake2b(text.strip().lower().encode(), digest_size=12).hexdigest()
 
 def update_vector_db_with_new_data():
-    """PHASE 2: Zaktualizuj ChromaDB nowymi przykładami treningowymi"""
-    if chroma_client is None or sentence_model is None:
+    """PHASE 2: Zaktualizuj ChromaDB nowymi przykładami treningowymi (tylko różnica)"""
+    global collection
+    if chroma_client is None or collection is None or _get_sentence_model() is None:
         return
 
-    training_data = load_training_data()
-    current_count = collection.count() if collection else 0
+    # Vectors written by another sentence-model backend cannot be queried with this one - start over
+    backend = _embedding_backend()
+    if (collection.metadata or {}).get("embedding_backend") != backend:
+        print(f"🔄 Vector database z innego backendu, przebudowa ({backend})")
+        chroma_client.delete_collection(name=VECTOR_COLLECTION_NAME)
+        collection = chroma_client.create_collection(
+            name=VECTOR_COLLECTION_NAME, metadata={**VECTOR_COLLECTION_METADATA, "embedding_backend": backend}
+        )
+
+    # Desired state keyed by content id; duplicate texts collapse onto the newest row,
+    # so a feedback correction replaces the stored label (same rule as load_corpus)
+    wanted = {}
+    for item in load_training_data():
+        wanted[_example_id(item['text'])] = item
+    existing = collection.get(include=['metadatas'])
+    current = dict(zip(existing['ids'], existing['metadatas']))
+
+    stale = [id_ for id_ in current if id_ not in wanted]
+    changed = [
+        id_ for id_, item in wanted.items()
+        if id_ not in current or (current[id_] or {}).get('quadrant') != item['quadrant']
+    ]
+    if not stale and not changed:
+        return
+
+    print(f"🔄 Aktualizowanie vector database... (+{len(changed)} / -{len(stale)})")
+    if stale:
+        collection.delete(ids=stale)
+
+    # Encode and upsert only the delta, in batches
+    batch_size = 50
+    for i in range(0, len(changed), batch_size):
+        ids = changed[i:i+batch_size]
+        batch = [wanted[id_] for id_ in ids]
+
+        documents = [item['text'] for item in batch]
+        embeddings = encode_cached(documents).tolist()
+        metadatas = [{
+            'quadrant': item['quadrant'],
+            'source': item.get('added_by', 'default'),
+            'timestamp': item.get('timestamp', '')
+        } for item in batch]
+
+        collection.upsert(
+            documents=documents,
+            embeddings=embeddings,
+            metadatas=metadatas,
+            ids=ids
+        )
+
+    print(f"✅ Vector database zaktualizowana! {len(wanted)} dokumentów")
+
+@_load_once
+def _init_vector_db() -> bool:
+    """Initialize vector database with current data (Phase 2) - once, on first retrieval"""
+    try:
+        update_vector_db_with_new_data()
+        return True
+    except Exception as e:
+        print(f"⚠️ Unable to initialize vector database: {e}")
+        return False
 
-    if current_count != len(training_data):
-        print(f"🔄 Aktualizowanie vector database... ({current_count} → {len(training_data)})")
+# Cross-encoder setup for Phase 3
+@_load_once
+def _get_cross_encoder():
+    """Cross-encoder loaded on first use, None if unavailable"""
+    try:
+        from sentence_transformers import CrossEncoder
 
-        # Clear old data
+        # Same split as the bi-encoder: int8 ONNX Runtime on CPU, PyTorch as fallback
         try:
-            chroma_client.delete_collection(name="task_examples")
-            collection = chroma_client.create_collection(name="task_examples")
-        except:
-            collection = chroma_client.get_or_create_collection(name="task_examples")
-
-        # Add all data in batches
-        batch_size = 50
-        for i in range(0, len(training_data), batch_size):
-            batch = training_data[i:i+batch_size]
-
-            documents = [item['text'] for item in batch]
-            embeddings = sentence_model.encode(documents).tolist()
-            metadatas = [{
-                'quadrant': item['quadrant'],
-                'source': item.get('added_by', 'default'),
-                'timestamp': item.get('timestamp', '')
-            } for item in batch]
-            ids = [f"example_{j}" for j in range(i, i+len(batch))]
-
-            collection.add(
-                documents=documents,
-                embeddings=embeddings,
-                metadatas=metadatas,
-                ids=ids
+            cross_encoder = CrossEncoder(
+                CROSS_ENCODER_NAME, max_length=CROSS_ENCODER_MAX_LENGTH,
+                backend="onnx", model_kwargs={"file_name": CROSS_ENCODER_ONNX_FILE}
             )
+            print("✅ Cross-encoder załadowany (ONNX int8)")
+        except Exception as e:
+            print(f"⚠️ ONNX cross-encoder niedostępny ({e}), używam PyTorch")
+            _configure_torch()
+            cross_encoder = CrossEncoder(CROSS_ENCODER_NAME, max_length=CROSS_ENCODER_MAX_LENGTH)
+            print("✅ Cross-encoder załadowany")
+
+        # Warmup forward: session/allocator setup happens here, not in the first request
+        cross_encoder.predict([["warmup", "warmup text"]], show_progress_bar=False)
+        return cross_encoder
+    except Exception as e:
+        print(f"⚠️ Cross-encoder nie załadowany: {e}")
+        return None
 
-        print(f"✅ Vector database zaktualizowana! {len(training_data)} dokumentów")
+def warm_rag():
+    """Load the retrieval stack ahead of the first RAG request (for long-running servers)"""
+    _get_sentence_model()
+    _get_cross_encoder()
+    _init_vector_db()
+    _get_embedding_head()
 
-# Cross-encoder setup for Phase 3
-cross_encoder = None
-try:
-    cross_encoder = CrossEncoder('cross-encoder/ms-marco-MiniLM-L-6-v2')
-    print("✅ Cross-encoder załadowany")
-except Exception as e:
-    print(f"⚠️ Cross-encoder nie załadowany: {e}")
+def _warm_models():
+    try:
+        get_model()
+        warm_rag()
+    except Exception as e:
+        print(f"⚠️ Rozgrzewanie modeli nieudane: {e}")
+
+@app.on_event("startup")
+def start_model_warmup():
+    """Load the model and retrieval stack in the background (fusion_server warms its own via warm_rag)
+
+    The server answers health checks meanwhile; the loaders are locked, so requests
+    arriving early wait for this load instead of repeating it.
+    """
+    threading.Thread(target=_warm_models, name="model-warmup", daemon=True).start()
+
+def _capability(loader, module: str) -> bool:
+    """Loaded component's real status, otherwise whether its package is installed - never triggers a load"""
+    if loader.loaded():
+        return loader() is not None
+    return importlib.util.find_spec(module) is not None
 
 def rerank_with_cross_encoder(query: str, similar_examples: List[Dict]) -> List[Dict]:
     """PHASE 3: Popraw ranking używając cross-encodera"""
+    cross_encoder = _get_cross_encoder()
     if cross_encoder is None or len(similar_examples) < 2:
         return similar_examples
 
@@ -563,8 +1216,10 @@ def rerank_with_cross_encoder(query: str, similar_examples: List[Dict]) -> List[
     pairs = [[query, ex['text']] for ex in similar_examples]
 
     try:
-        # Get cross-encoder scores (higher = better match)
-        cross_scores = cross_encoder.predict(pairs)
+        # Get cross-encoder scores (higher = better match) - all pairs in one forward pass
+        cross_scores = cross_encoder.predict(
+            pairs, batch_size=len(pairs), show_progress_bar=False, convert_to_numpy=True
+        )
 
         # Update similarity scores with cross-encoder results
         for i, ex in enumerate(similar_examples):
@@ -590,25 +1245,60 @@ def rerank_with_cross_encoder(query: str, similar_examples: List[Dict]) -> List[
         print(f"⚠️ Cross-encoder reranking failed: {e}")
         return similar_examples
 
-def rag_classify(query: str) -> Dict:
+def rag_classify(query: str, query_embedding: Optional[np.ndarray] = None) -> Dict:
     """PHASE 3: Klasyfikacja z wykorzystaniem Advanced RAG"""
     # First, get AI model prediction
-    model_prediction = int(get_model().predict([query])[0])
+    model_prediction = predict_one(query, query_embedding)
+    return rag_classify_with_prediction(query, model_prediction, query_embedding)
+
+def rag_classify_batch(queries: List[str]) -> List[Dict]:
+    """Klasyfikacja RAG wielu zadań z jednym wsadowym wywołaniem model.predict"""
+    if not queries:
+        return []
+
+    # One batched encode for all queries instead of one per retrieval
+    query_embeddings = _encode_queries(queries)
 
-    # Then, find similar examples (RAG retrieval)
-    similar_examples = find_similar_examples(query, top_k=8)  # Get more for better reranking
+    head = _get_embedding_head()
+    if head is not None:
+        weights, bias = head
+        model_predictions = np.argmax(np.stack(query_embeddings) @ weights.T + bias, axis=1)
+    else:
+        model_predictions = get_model().predict(queries)
+    return [
+        rag_classify_with_prediction(query, int(prediction), query_embedding)
+        for query, prediction, query_embedding in zip(queries, model_predictions, query_embeddings)
+    ]
+
+def retrieve_examples(query: str, query_embedding: Optional[np.ndarray] = None) -> List[Dict]:
+    """RAG retrieval: bi-encoder candidates, cross-encoder reranking, top 5"""
+    # Find similar examples (RAG retrieval)
+    similar_examples = find_similar_examples(query, top_k=RERANK_FANOUT, query_embedding=query_embedding)  # Get more for better reranking
 
     # Phase 3: Apply cross-encoder reranking if available
-    if cross_encoder is not None:
+    if _get_cross_encoder() is not None:
         similar_examples = rerank_with_cross_encoder(query, similar_examples)
 
     # Keep only top 5 after reranking
-    similar_examples = similar_examples[:5]
+    return similar_examples[:5]
+
+def rag_classify_with_prediction(query: str, model_prediction: int, query_embedding: Optional[np.ndarray] = None,
+                                 similar_examples: Optional[List[Dict]] = None) -> Dict:
+    """Retrieval, reranking and score fusion on top of a model prediction
+
+    similar_examples may be passed in when retrieval already ran (e.g. concurrently with the prediction).
+    """
+    if similar_examples is None:
+        similar_examples = retrieve_examples(query, query_embedding)
+    # Single pass per field straight into arrays - every statistic below reuses them
+    n_examples = len(similar_examples)
+    similarities = np.fromiter((ex['similarity'] for ex in similar_examples), dtype=np.float64, count=n_examples)
+    quadrants = np.fromiter((ex['quadrant'] for ex in similar_examples), dtype=np.intp, count=n_examples)
 
     # Active Learning: Check confidence (PHASE 3 feature)
     if len(similar_examples) > 0:
-        avg_similarity = np.mean([ex['similarity'] for ex in similar_examples])
-        max_similarity = max([ex['similarity'] for ex in similar_examples])
+        avg_similarity = similarities.mean()
+        max_similarity = similarities.max()
 
         # If uncertain, suggest asking user
         confidence_level = "high"
@@ -624,18 +1314,11 @@ def rag_classify(query: str) -> Dict:
         confidence_level = "no_reference"
         needs_user_input = True
 
-    # Weighted scoring based on similar examples
-    quadrant_scores = np.zeros(4)
+    # Weighted scoring based on similar examples - one bincount instead of a per-example loop
+    weights = similarities * 0.6  # Increased weight for better RAG
+    quadrant_scores = np.bincount(quadrants, weights=weights, minlength=4)
     quadrant_scores[model_prediction] += 1  # Model prediction has weight 1
-
-    # Add weights from similar examples
-    total_weight = 1  # Start with model's weight
-    for example in similar_examples:
-        quadrant = example['quadrant']
-        similarity = example['similarity']
-        weight = similarity * 0.6  # Increased weight for better RAG
-        quadrant_scores[quadrant] += weight
-        total_weight += weight
+    total_weight = 1 + weights.sum()  # Start with model's weight
 
     # Normalize scores
     if total_weight > 0:
@@ -650,7 +1333,7 @@ def rag_classify(query: str) -> Dict:
     rag_influence = "zachował decyzję"
     if final_prediction != model_prediction:
         rag_influence = "zmienił decyzję"
-    elif similar_examples and max([ex['similarity'] for ex in similar_examples]) > 0.7:
+    elif similar_examples and max_similarity > 0.7:
         rag_influence = "potwierdził decyzję"
 
     return {
@@ -663,23 +1346,30 @@ def rag_classify(query: str) -> Dict:
         "similar_examples_used": len(similar_examples),
         "similar_examples": similar_examples,
         "advanced_features": {
-            "bert_embeddings": sentence_model is not None,
+            "bert_embeddings": _get_sentence_model() is not None,
             "vector_database": chroma_client is not None,
-            "cross_encoder_reranking": cross_encoder is not None
+            "cross_encoder_reranking": _get_cross_encoder() is not None
         }
     }
 
 @app.get("/classify")
-def classify_text(
+async def classify_text(
     title: str = Query(..., description="Tytuł zadania do sklasyfikowania"),
     use_rag: bool = Query(True, description="Czy używać RAG do lepszej klasyfikacji")
 ):
     """Klasyfikacja pojedynczego zadania (z opcjonalnym RAG)"""
     if use_rag:
-        rag_result = rag_classify(title)
+        # Query embedding is batched with concurrent requests, retrieval runs in the threadpool
+        query_embedding = await app.state.embed_batcher.submit(title)
+        # Model prediction and retrieval + reranking only share the embedding - run them side by side
+        model_prediction, similar_examples = await asyncio.gather(
+            run_in_threadpool(predict_one, title, query_embedding),
+            run_in_threadpool(retrieve_examples, title, query_embedding)
+        )
+        rag_result = rag_classify_with_prediction(title, model_prediction, query_embedding, similar_examples)
         predicted_quadrant = rag_result["prediction"]
     else:
-        predicted_quadrant = int(get_model().predict([title])[0])
+        predicted_quadrant = await run_in_threadpool(predict_one, title)
         rag_result = None
 
     urgent, important = map_to_bool(predicted_quadrant)
@@ -705,6 +1395,23 @@ def classify_text(
 
     return response
 
+_text_index = None  # (corpus file signature, set of lowercased example texts)
+
+def _get_text_index() -> set:
+    """Lowercased texts of the corpus for O(1) duplicate checks, rebuilt when the corpus file changes"""
+    global _text_index
+    signature = _corpus_signature()
+    if _text_index is None or _text_index[0] != signature:
+        _text_index = (signature, {item['text'].lower() for item in load_training_data()})
+    return _text_index[1]
+
+def _index_text(text: str):
+    """Record a text just saved by us, so the index stays valid without a rebuild"""
+    global _text_index
+    texts = _get_text_index() if _text_index is None else _text_index[1]
+    texts.add(text.lower())
+    _text_index = (_corpus_signature(), texts)
+
 @app.post("/add-example")
 def add_training_example(
     text: str = Query(..., description="Tekst przykładu treningowego"),
@@ -714,12 +1421,11 @@ def add_training_example(
     if quadrant not in QUADRANT_NAMES:
         raise HTTPException(status_code=400, detail="Nieprawidłowy numer kwadrantu. Musi być 0-3.")
 
-    training_data = load_training_data()
-
     # Check if example already exists
-    for example in training_data:
-        if example['text'].lower() == text.lower():
-            raise HTTPException(status_code=400, detail="Przykład już istnieje")
+    if text.lower() in _get_text_index():
+        raise HTTPException(status_code=400, detail="Przykład już istnieje")
+
+    training_data = load_training_data()
 
     # Add new example
     new_example = {
@@ -731,6 +1437,7 @@ def add_training_example(
 
     training_data.append(new_example)
     save_training_data(training_data)
+    _index_text(text)
 
     return {
         "message": "✅ Przykład dodany pomyślnie",
@@ -745,28 +1452,32 @@ def retrain_model(
     force_complete_retrain: bool = Query(False, description="Wymusić pełne retrenowanie bez inkrementalnego uczenia")
 ):
     """Przeszkolenie modelu z opcjami zachowania doświadczenia"""
-    global model
+    global model, _linear_head
 
     print("🔄 Rozpoczęcie retreningu...")
 
     if preserve_experience and not force_complete_retrain and model is not None:
         try:
-            # Incremental learning - partial_fit if LogisticRegression supports it
-            training_data = load_training_data()
-            texts = [item['text'] for item in training_data]
-            labels = [item['quadrant'] for item in training_data]
-
-            # Extract features first
-            X_new = model.named_steps['tfidf'].transform(texts)
-            model.named_steps['clf'].partial_fit(X_new, labels)
-
-            joblib.dump(model, model_path)
-
+            # Incremental learning - partial_fit on examples added since last training
+            previously_seen = getattr(model, 'n_training_examples_', 0)
+            updated = train_model(base_model=model)
+
+            if updated is model:
+                _linear_head = None  # Coefficients changed - re-extract on next predict
+                return {
+                    "message": "✅ Model zaktualizowany inkrementalnie",
+                    "method": "incremental",
+                    "examples_used": model.n_training_examples_ - previously_seen,
+                    "performance": "zachowana poprzednia wiedza"
+                }
+
+            # Corpus no longer extends the trained one - train_model refitted from scratch
+            model = updated
             return {
-                "message": "✅ Model zaktualizowany inkrementalnie",
-                "method": "incremental",
-                "examples_used": len(training_data),
-                "performance": "zachowana poprzednia wiedza"
+                "message": "✅ Model całkowicie retrenowany",
+                "method": "complete",
+                "examples_used": model.n_training_examples_,
+                "performance": "maksymalna aktualność"
             }
         except Exception as e:
             print(f"⚠️ Inkrementalne nauczanie nieudane: {e}")
@@ -857,10 +1568,13 @@ def clear_training_data(
         os.remove(training_data_file)
     if os.path.exists(model_path):
         os.remove(model_path)
+    if os.path.exists(HEAD_PATH):
+        os.remove(HEAD_PATH)
 
     # Reset global model
-    global model
+    global model, _embedding_head
     model = None
+    _embedding_head = None
 
     return {"message": "⚠️ Wszystkie dane treningowe i model zostały usunięte"}
 
@@ -926,9 +1640,15 @@ def extract_tasks_from_image(
     if not file.filename.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.tiff')):
         raise HTTPException(status_code=400, detail="Nieobsługiwany format pliku. Użyj PNG, JPG, JPEG, BMP lub TIFF.")
 
+    if file.size is not None and file.size > MAX_IMAGE_BYTES:
+        raise HTTPException(status_code=413, detail="Plik jest za duży (max 10 MB)")
+
     try:
-        # Read image data
-        image_data = await file.read()
+        # Read image data (sync endpoint runs in the threadpool, so read the spooled file directly).
+        # One byte past the cap is enough to reject uploads that did not report their size.
+        image_data = file.file.read(MAX_IMAGE_BYTES + 1)
+        if len(image_data) > MAX_IMAGE_BYTES:
+            raise HTTPException(status_code=413, detail="Plik jest za duży (max 10 MB)")
 
         # Extract text and tasks using OCR
         ocr_result = extract_text_from_image(image_data)
@@ -981,6 +1701,59 @@ def extract_tasks_from_image(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"OCR processing failed: {str(e)}")
 
+@app.post("/ocr-batch")
+async def ocr_batch(
+    files: List[UploadFile] = File(..., description="Obrazy zawierające zadania (JPG, PNG, etc.)")
+):
+    """OCR wielu obrazów równolegle w puli procesów Tesseract"""
+    if len(files) > MAX_OCR_FILES:
+        raise HTTPException(status_code=413, detail=f"Maksymalnie {MAX_OCR_FILES} obrazów na raz")
+
+    for file in files:
+        if not file.filename.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.tiff')):
+            raise HTTPException(status_code=400, detail=f"Nieobsługiwany format pliku: {file.filename}")
+        if file.size is not None and file.size > MAX_IMAGE_BYTES:
+            raise HTTPException(status_code=413, detail=f"Plik jest za duży (max 10 MB): {file.filename}")
+
+    # Checked as each file is read - an oversized upload stops the request before the rest is buffered
+    images = []
+    for file in files:
+        image_data = await file.read(MAX_IMAGE_BYTES + 1)
+        if len(image_data) > MAX_IMAGE_BYTES:
+            raise HTTPException(status_code=413, detail=f"Plik jest za duży (max 10 MB): {file.filename}")
+        images.append(image_data)
+
+    loop = asyncio.get_running_loop()
+    try:
+        ocr_results = await asyncio.gather(*(
+            loop.run_in_executor(app.state.ocr_pool, _ocr_one, image_data)
+            for image_data in images
+        ))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"OCR processing failed: {str(e)}")
+
+    results = []
+    for file, image_data, ocr_result in zip(files, images, ocr_results):
+        if "error" in ocr_result:
+            results.append({"filename": file.filename, "error": ocr_result["error"]})
+            continue
+        results.append({
+            "filename": file.filename,
+            "image_info": {
+                "size_bytes": len(image_data),
+                "shape": ocr_result["image_shape"]
+            },
+            "extracted_text": ocr_result["extracted_text"][:500],  # Limit text length
+            "tasks": find_potential_tasks(ocr_result["extracted_text"]),
+            "method": ocr_result["method"]
+        })
+
+    return {
+        "images": results,
+        "total_images": len(files),
+        "timestamp": datetime.now().isoformat()
+    }
+
 def summarize_quadrant_distribution(tasks: List[Dict]) -> Dict:
     """Summarize how tasks are distributed across quadrants"""
     distribution = {i: 0 for i in range(4)}
@@ -995,8 +1768,37 @@ def summarize_quadrant_distribution(tasks: List[Dict]) -> Dict:
         "quadrant_names": {q: QUADRANT_NAMES[q] for q in range(4)}
     }
 
+BATCH_ANALYZE_CONCURRENCY = 8  # Tasks analyzed at once by /batch-analyze
+
+def _analyze_task(task_text: str) -> Dict:
+    """RAG + LangChain analysis of one task (blocking - run in the threadpool)"""
+    task_result = {
+        "task": task_text,
+        "analyses": {}
+    }
+
+    # RAG Analysis
+    try:
+        rag_result = rag_classify(task_text)
+        task_result["analyses"]["rag"] = {
+            "quadrant": rag_result["prediction"],
+            "quadrant_name": QUADRANT_NAMES[rag_result["prediction"]],
+            "confidence": rag_result["confidence"]
+        }
+    except Exception as e:
+        task_result["analyses"]["rag"] = {"error": str(e)}
+
+    # LangChain Analysis
+    try:
+        langchain_result = analyze_task_with_langchain(task_text)
+        task_result["analyses"]["langchain"] = langchain_result
+    except Exception as e:
+        task_result["analyses"]["langchain"] = {"error": str(e)}
+
+    return task_result
+
 @app.post("/batch-analyze")
-def batch_analyze_tasks(
+async def batch_analyze_tasks(
     tasks: List[str] = Query(..., description="Lista zadań do analizy")
 ):
     """Wsadowa analiza wielu zadań z różnymi metodami"""
@@ -1006,38 +1808,18 @@ def batch_analyze_tasks(
     if len(tasks) > 50:  # Limit batch size
         raise HTTPException(status_code=400, detail="Maksymalnie 50 zadań na raz")
 
-    results = []
     summary = {"methods": {}, "total_tasks": len(tasks)}
 
-    for task_text in tasks:
-        if not task_text.strip():
-            continue
-
-        task_result = {
-            "task": task_text,
-            "analyses": {}
-        }
+    # Tasks are independent - analyze them concurrently in the threadpool, a bounded number at a time
+    semaphore = asyncio.Semaphore(BATCH_ANALYZE_CONCURRENCY)
 
-        # RAG Analysis
-        try:
-            rag_result = rag_classify(task_text)
-            task_result["analyses"]["rag"] = {
-                "quadrant": rag_result["prediction"],
-                "quadrant_name": QUADRANT_NAMES[rag_result["prediction"]],
-                "confidence": rag_result["confidence"]
-            }
-        except Exception as e:
-            task_result["analyses"]["rag"] = {"error": str(e)}
-
-        # LangChain Analysis
-        try:
-            langchain_result = analyze_task_with_langchain(task_text)
-            task_result["analyses"]["langchain"] = langchain_result
-        except Exception as e:
-            task_result["analyses"]["langchain"] = {"error": str(e)}
+    async def analyze(task_text: str) -> Dict:
+        async with semaphore:
+            return await run_in_threadpool(_analyze_task, task_text)
 
-        results.append(task_result)
+    results = await asyncio.gather(*(analyze(task_text) for task_text in tasks if task_text.strip()))
 
+    for task_result in results:
         # Update summary
         for method in ["rag", "langchain"]:
             if method not in summary["methods"]:
@@ -1058,16 +1840,18 @@ def batch_analyze_tasks(
 @app.get("/capabilities")
 def get_capabilities():
     """Sprawdź dostępne funkcjonalności AI"""
+    # Cheap by design: `/` (the container health check) reports these, so no model is loaded here
+    bert = _capability(_get_sentence_model, "sentence_transformers")
     return {
         "ai_features": {
             "basic_classification": True,
-            "rag_enhanced": chroma_client is not None and sentence_model is not None,
+            "rag_enhanced": chroma_client is not None and bert,
             "vector_database": chroma_client is not None,
-            "bert_embeddings": sentence_model is not None,
-            "cross_encoder_reranking": cross_encoder is not None,
-            "langchain_analysis": langchain_llm is not None and langchain_prompt is not None,
-            "ocr_image_processing": "opencv" in "opencv-python",  # Check if installed
-            "multilingual_support": sentence_model is not None
+            "bert_embeddings": bert,
+            "cross_encoder_reranking": _capability(_get_cross_encoder, "sentence_transformers"),
+            "langchain_analysis": _capability(_get_langchain_chain, "langchain"),
+            "ocr_image_processing": _capability(_get_tess_api, "tesserocr") or importlib.util.find_spec("cv2") is not None,
+            "multilingual_support": bert
         },
         "supported_languages": ["Polish", "English"],
         "last_updated": datetime.now().isoformat(),
@@ -1089,6 +1873,7 @@ def root():
             "GET /classify": "Podstawowa klasyfikacja zadania",
             "POST /analyze-langchain": "Zaawansowana analiza z LangChain",
             "POST /extract-tasks-from-image": "OCR ekstrakcja zadań z obrazów",
+            "POST /ocr-batch": "Równoległy OCR wielu obrazów",
             "POST /batch-analyze": "Wsadowa analiza wielu zadań",
             "GET /capabilities": "Sprawdź dostępne funkcjonalności",
             "POST /add-example": "Dodaj przykład treningowy",
@@ -0,0 +1,50 @@
+"""
+OCR worker functions for the process pool behind /ocr-batch.
+
+Kept out of main.py so spawned workers import only this module, not the
+BERT/Chroma/LangChain stack. Each worker loads its own Tesseract API once
+in _init_tess and reuses it for every image it is handed.
+"""
+
+import io
+import os
+from typing import Dict
+
+API = None  # Per-process tesserocr.PyTessBaseAPI, None -> pytesseract fallback
+
+
+def _init_tess():
+    """Process pool initializer: load the Tesseract API once per worker"""
+    global API
+    # Parallelism comes from the pool - keep Tesseract's OpenMP threads from oversubscribing cores
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    try:
+        import tesserocr
+        API = tesserocr.PyTessBaseAPI(lang='pol+eng', psm=tesserocr.PSM.AUTO)
+    except Exception:
+        API = None
+
+
+def _ocr_one(image_data: bytes) -> Dict:
+    """OCR a single image in the worker process"""
+    from PIL import Image
+
+    try:
+        img = Image.open(io.BytesIO(image_data)).convert('L')
+    except OSError:
+        return {"error": "Invalid image format"}
+
+    if API is not None:
+        API.SetImage(img)
+        text = API.GetUTF8Text()
+        method = "Tesseract API"
+    else:
+        import pytesseract
+        text = pytesseract.image_to_string(img, lang='pol+eng', config='--psm 3')
+        method = "Tesseract"
+
+    return {
+        "extracted_text": text,
+        "image_shape": f"{img.height}x{img.width}",
+        "method": method
+    }